@@ -1,12 +1,20 @@
 import streamlit as st
-import asyncio
 from pathlib import Path
 from datetime import datetime
-import zipfile
+import io
 import json
-import shutil
+import os
+import uuid
 from urllib.parse import urlparse
-from pdf_crawler import PDFCrawler, CONFIG
+from crawl_jobs import CrawlJob, CrawlJobManager
+from pdf_crawler import CrawlerConfig
+from run_manifest import load_manifest, load_search_index
+from zip_stream import iter_zip, unique_names
+
+# Rows rendered per page of the results list; reruns only pay for what is on screen
+FILES_PER_PAGE = 50
+# Seconds between refreshes of the scan and download views while their job runs
+POLL_INTERVAL = 1.0
 
 st.set_page_config(
     page_title="PDF Crawler",
@@ -14,13 +22,255 @@ st.set_page_config(
     layout="wide"
 )
 
-def zip_directory(source_dir: Path, output_path: Path):
-    """Zip a directory and return the zip file path"""
-    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for file in source_dir.rglob('*'):
-            if file.is_file():
-                zipf.write(file, file.relative_to(source_dir))
-    return output_path
+@st.cache_resource
+def crawl_jobs() -> CrawlJobManager:
+    """One background event loop for the server; each session keeps its own jobs in session state"""
+    return CrawlJobManager(max_concurrent_jobs=int(os.environ.get("PDF_CRAWLER_MAX_JOBS", "2")))
+
+def manifest_mtime(manifest_file) -> float:
+    try:
+        return os.path.getmtime(manifest_file)
+    except OSError:
+        return 0.0
+
+@st.cache_resource(max_entries=2, show_spinner="Đang nén file...")
+def zip_bytes(manifest_file: str, mtime: float, entries: tuple) -> bytes:
+    """Stored (uncompressed) zip of (path, name) entries, built once per manifest version and selection.
+
+    st.download_button needs the whole payload, so the chunks go straight into one buffer
+    rather than being joined into a second copy.
+    """
+    buffer = io.BytesIO()
+    for chunk in iter_zip(entries):
+        buffer.write(chunk)
+    return buffer.getvalue()
+
+def toggle_selected(path: str, key: str):
+    if st.session_state[key]:
+        st.session_state.selected_paths.add(path)
+    else:
+        st.session_state.selected_paths.discard(path)
+    if st.session_state.get("prepare_download") == "selected":
+        # The prepared archive no longer matches the selection
+        st.session_state.prepare_download = None
+
+def render_file_page(entries, icon: str, section: str):
+    """Checkbox rows for one page of entries; selections live in session state so they survive paging"""
+    pages = (len(entries) + FILES_PER_PAGE - 1) // FILES_PER_PAGE
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Trang (1-{pages})", min_value=1, max_value=pages, value=1, key=f"{section}_page")
+
+    for entry in entries[(page - 1) * FILES_PER_PAGE:page * FILES_PER_PAGE]:
+        key = f"pick_{entry['path']}"
+        col1, col2 = st.columns([0.05, 0.95])
+        with col1:
+            st.checkbox(
+                "Select file",
+                value=entry["path"] in st.session_state.selected_paths,
+                key=key,
+                on_change=toggle_selected,
+                args=(entry["path"], key),
+                label_visibility="hidden"
+            )
+        with col2:
+            st.text(f"{icon} {entry['path']}")
+            url = entry["url"]
+            st.caption(f"🔗 {url[:80]}{'...' if len(url) > 80 else ''} · {entry['size_bytes'] / (1024 * 1024):.2f} MB")
+            if entry.get("anchor_text"):
+                st.caption(f"🏷️ {entry['anchor_text']}")
+
+def toggle_discovered(url: str, key: str):
+    if st.session_state[key]:
+        st.session_state.selected_urls.add(url)
+    else:
+        st.session_state.selected_urls.discard(url)
+
+def show_log(log_file: str):
+    log_file = Path(log_file)
+    if log_file.exists():
+        with st.expander("📝 Chi tiết lỗi (log)"):
+            with open(log_file, 'r') as f:
+                st.text(f.read())
+
+def reset_scan():
+    # The scan keeps its crawler for the selected download; nothing needs it after this
+    for key in ('scan_job', 'download_job'):
+        if st.session_state[key] is not None:
+            crawl_jobs().release(st.session_state[key])
+    st.session_state.scan_job = None
+    st.session_state.download_job = None
+    st.session_state.selected_urls = set()
+
+def discovery_view(job: CrawlJob, live: bool):
+    """Scan progress and the PDFs found so far; reruns on its own every POLL_INTERVAL while the scan runs"""
+    if live and job.finished:
+        # One full rerun so the view is rebuilt without polling
+        st.rerun()
+
+    snapshot = job.snapshot()
+    discovered = job.discovered_since(0)
+    pages = sum(site["pages"] for site in snapshot["sites"].values())
+    status = f"🔍 Đã quét {snapshot['sites_done']}/{snapshot['sites_total']} site, {pages} trang, tìm thấy {len(discovered)} PDF"
+
+    if not job.finished:
+        st.progress(max(snapshot["progress"], 2), text="⏳ Đang chờ đến lượt..." if job.status == 'queued' else status + "...")
+        if st.button("⏹️ Dừng quét"):
+            crawl_jobs().cancel(job.id)
+            st.rerun()
+    elif job.status == 'failed':
+        st.error(f"❌ Lỗi: {job.error}")
+        show_log(job.config["log_file"])
+    elif job.status == 'cancelled':
+        st.warning(f"⏹️ Đã dừng quét. {status}")
+    elif discovered:
+        st.success(f"✅ Đã tìm thấy {len(discovered)} file PDF!")
+    else:
+        st.warning("⚠️ Không tìm thấy PDF nào")
+
+    if not discovered:
+        if job.finished and st.button("🔄 Quét lại", use_container_width=True):
+            reset_scan()
+            st.rerun()
+        return
+
+    st.markdown("---")
+    st.subheader("📋 Chọn PDFs để tải xuống")
+
+    discover_query = st.text_input(
+        "🔍 Tìm theo tên file, URL và tiêu đề liên kết",
+        key="discover_query",
+        placeholder="Ví dụ: báo cáo thường niên 2023"
+    )
+
+    # Matches from the crawler's search index first, best first
+    order = discovered
+    hits = set()
+    if discover_query.strip() and job.crawler is not None:
+        by_url = {pdf['url']: pdf for pdf in discovered}
+        # The index is updated on the job loop, so it is queried there too
+        ranked = crawl_jobs().call(job.crawler.search_pdfs, discover_query, None)
+        hits = {url for url, _ in ranked if url in by_url}
+        order = [by_url[url] for url, _ in ranked if url in by_url] + [pdf for pdf in discovered if pdf['url'] not in hits]
+
+    # Display table header
+    col1, col2, col3, col4 = st.columns([0.5, 3, 2, 2])
+    with col1:
+        st.markdown("**Chọn**")
+    with col2:
+        st.markdown("**Tên file**")
+    with col3:
+        st.markdown("**Domain**")
+    with col4:
+        st.markdown("**URL**")
+
+    st.markdown("---")
+
+    pages = (len(order) + FILES_PER_PAGE - 1) // FILES_PER_PAGE
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Trang (1-{pages})", min_value=1, max_value=pages, value=1, key="discover_page")
+
+    # Display PDFs with checkboxes; selections live in session state so they survive paging and polling
+    selected_urls = st.session_state.selected_urls
+    for pdf in order[(page - 1) * FILES_PER_PAGE:page * FILES_PER_PAGE]:
+        key = f"pdf_{pdf['url']}"
+        col1, col2, col3, col4 = st.columns([0.5, 3, 2, 2])
+        with col1:
+            st.checkbox(
+                "Select file",
+                value=pdf['url'] in selected_urls,
+                key=key,
+                on_change=toggle_discovered,
+                args=(pdf['url'], key),
+                label_visibility="hidden"
+            )
+        with col2:
+            st.write(f"🎯 {pdf['filename']}" if pdf['url'] in hits else pdf['filename'])
+            if pdf.get('anchor_text') or pdf.get('heading'):
+                st.caption(" · ".join(text for text in (pdf.get('heading'), pdf.get('anchor_text')) if text))
+            if pdf.get('size_bytes'):
+                st.caption(f"{pdf['size_bytes'] / (1024 * 1024):.2f} MB")
+        with col3:
+            st.write(pdf['domain'])
+        with col4:
+            url_display = pdf['url'][:40] + "..." if len(pdf['url']) > 40 else pdf['url']
+            st.write(url_display)
+
+    st.markdown("---")
+
+    selected_pdfs = [pdf for pdf in discovered if pdf['url'] in selected_urls]
+
+    # Summary of selection
+    if selected_pdfs:
+        st.info(f"ℹ️ Đã chọn {len(selected_pdfs)} / {len(discovered)} file PDF")
+    else:
+        st.warning("⚠️ Chưa chọn file nào")
+
+    # Download selected PDFs button
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("📥 Download Selected PDFs", type="primary", use_container_width=True, disabled=len(selected_pdfs)==0):
+            # The download shares the scan's crawler, so a running scan stops here with what it has found
+            crawl_jobs().cancel(job.id)
+            st.session_state.download_job = crawl_jobs().submit_selected(job, selected_pdfs)
+            st.rerun()
+        if not job.finished:
+            st.caption("Tải xuống sẽ dừng quá trình quét và tải các file đã chọn ngay")
+
+    with col2:
+        if st.button("🔄 Quét lại", use_container_width=True):
+            crawl_jobs().cancel(job.id)
+            reset_scan()
+            st.rerun()
+
+def download_view(job: CrawlJob, live: bool):
+    """Progress of the selected downloads; moves on to the results view once they finish"""
+    if job.status == 'done':
+        finish_download(job)
+        st.rerun()
+    if live and job.finished:
+        st.rerun()
+
+    snapshot = job.snapshot()
+    if not job.finished:
+        mb = snapshot["bytes_downloaded"] / (1024 * 1024)
+        text = "⏳ Đang chờ quét xong..." if job.status == 'queued' else \
+            f"🔄 Đã tải {snapshot['pdfs_downloaded']}/{len(job.selection)} file PDF ({mb:.1f} MB)..."
+        st.progress(max(snapshot["progress"], 2), text=text)
+        return
+
+    st.error(f"❌ Lỗi: {job.error}" if job.error else "⏹️ Đã dừng tải")
+    show_log(job.config["log_file"])
+    if st.button("↩️ Quay lại danh sách PDF", use_container_width=True):
+        crawl_jobs().release(job)
+        st.session_state.download_job = None
+        st.rerun()
+
+def finish_download(job: CrawlJob):
+    """Save the finished download's results to session state and leave the discovery phase"""
+    crawler = job.crawler
+
+    # Load metadata for the details view; the file list comes from the run manifest
+    metadata_file = Path(crawler.config["metadata_file"])
+    metadata = {}
+    if metadata_file.exists():
+        with open(metadata_file, 'r') as f:
+            metadata = json.load(f)
+
+    st.session_state.crawl_results = {
+        'metadata': crawler.metadata,
+        'failed_downloads': crawler.failed_downloads,
+        'run_dir': st.session_state.run_dir,
+        'output_dir': st.session_state.output_dir,
+        'timestamp': st.session_state.timestamp,
+        'manifest_file': crawler.config["manifest_file"],
+        'metadata_file': crawler.config["metadata_file"],
+        'log_file': crawler.config["log_file"],
+        'full_metadata': metadata
+    }
+    st.session_state.selected_paths = set()
+    reset_scan()
 
 def main():
     st.title("📄 PDF Crawler")
@@ -29,12 +279,14 @@ def main():
     # Initialize session state for crawl results
     if 'crawl_results' not in st.session_state:
         st.session_state.crawl_results = None
-    if 'discovered_pdfs' not in st.session_state:
-        st.session_state.discovered_pdfs = []
-    if 'scan_complete' not in st.session_state:
-        st.session_state.scan_complete = False
-    if 'crawler_instance' not in st.session_state:
-        st.session_state.crawler_instance = None
+    if 'scan_job' not in st.session_state:
+        st.session_state.scan_job = None
+    if 'download_job' not in st.session_state:
+        st.session_state.download_job = None
+    if 'selected_urls' not in st.session_state:
+        st.session_state.selected_urls = set()
+    if 'selected_paths' not in st.session_state:
+        st.session_state.selected_paths = set()
     
     # URL input
     st.subheader("Nhập URLs")
@@ -73,8 +325,10 @@ def main():
             help="Thời gian chờ tối đa cho mỗi request"
         )
     
+    scan_job = st.session_state.scan_job
+
     # Phase 1: Discovery Button
-    if not st.session_state.scan_complete:
+    if scan_job is None:
         if st.button("🔍 Scan for PDFs (Discovery Phase)", type="primary", use_container_width=True):
             # Parse URLs
             urls = [url.strip() for url in urls_input.split('\n') if url.strip()]
@@ -103,185 +357,49 @@ def main():
             
             urls = valid_urls
             
-            # Update config
-            CONFIG["max_pages_per_site"] = max_pages
-            CONFIG["max_concurrent_downloads"] = max_concurrent
-            CONFIG["timeout"] = timeout
-            
             # Create unique output directory for this run in /tmp for Streamlit Cloud
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            run_dir = Path(f"/tmp/runs/run_{timestamp}")
+            run_dir = Path(f"/tmp/runs/run_{timestamp}_{uuid.uuid4().hex[:6]}")
             output_dir = run_dir / "downloaded_pdfs"
             output_dir.mkdir(parents=True, exist_ok=True)
             
-            # Update CONFIG paths
-            CONFIG["output_dir"] = str(output_dir)
-            CONFIG["log_file"] = str(run_dir / "pdf_crawler.log")
-            CONFIG["metadata_file"] = str(run_dir / "pdf_downloads_metadata.json")
-            CONFIG["progress_file"] = str(run_dir / "pdf_crawler_progress.json")
-            
-            # Progress indicators
-            progress_bar = st.progress(0)
-            status_text = st.empty()
+            # Per-run settings, so concurrent sessions never share paths
+            config = CrawlerConfig(
+                max_pages_per_site=max_pages,
+                max_concurrent_downloads=max_concurrent,
+                timeout=timeout,
+                output_dir=str(output_dir),
+                log_file=str(run_dir / "pdf_crawler.log"),
+                metadata_file=str(run_dir / "pdf_downloads_metadata.json"),
+                manifest_file=str(run_dir / "pdf_manifest.json"),
+                progress_file=str(run_dir / "pdf_crawler_progress.json"),
+                dead_letter_file=str(run_dir / "pdf_crawler_dead_letter.jsonl"),
+                # Keep the blob store on the same filesystem as the runs so PDFs can be hardlinked
+                blob_dir="/tmp/runs_blobs",
+                # Only list links that really serve a PDF, with their size
+                verify_pdfs=True,
+                # The scan view searches the PDFs found so far while the crawl runs
+                live_search_index=True
+            )
             
-            try:
-                status_text.text("🔄 Đang khởi tạo crawler...")
-                crawler = PDFCrawler()
-                
-                status_text.text(f"🔍 Đang quét {len(urls)} site(s) để tìm PDF...")
-                
-                # Run the crawler in discover mode
-                try:
-                    loop = asyncio.get_event_loop()
-                except RuntimeError:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                
-                result = loop.run_until_complete(crawler.run(urls, mode='discover'))
-                
-                progress_bar.progress(100)
-                status_text.text("✅ Quét hoàn thành!")
-                
-                # Store discovered PDFs in session state
-                st.session_state.discovered_pdfs = crawler.discovered_pdfs
-                st.session_state.scan_complete = True
-                st.session_state.crawler_instance = crawler
-                st.session_state.run_dir = run_dir
-                st.session_state.output_dir = output_dir
-                st.session_state.timestamp = timestamp
-                
-                # Trigger display by rerunning
-                st.rerun()
-                        
-            except Exception as e:
-                progress_bar.progress(0)
-                status_text.text("")
-                st.error(f"❌ Lỗi: {str(e)}")
-                
-                # Show log on error
-                log_file = Path(CONFIG["log_file"])
-                if log_file.exists():
-                    with st.expander("📝 Chi tiết lỗi (log)"):
-                        with open(log_file, 'r') as f:
-                            st.text(f.read())
+            # The scan runs on the background job loop; this script only polls it.
+            # The crawler is kept so the selected PDFs download into the same run.
+            st.session_state.scan_job = crawl_jobs().submit(urls, config, mode='discover', keep_crawler=True)
+            st.session_state.run_dir = run_dir
+            st.session_state.output_dir = output_dir
+            st.session_state.timestamp = timestamp
+            st.session_state.selected_urls = set()
+            st.rerun()
     
-    # Phase 2: Display discovered PDFs and Download Selected
-    if st.session_state.scan_complete and st.session_state.discovered_pdfs:
-        st.success(f"✅ Đã tìm thấy {len(st.session_state.discovered_pdfs)} file PDF!")
-        
-        st.markdown("---")
-        st.subheader("📋 Chọn PDFs để tải xuống")
-        
-        # Display table header
-        col1, col2, col3, col4 = st.columns([0.5, 3, 2, 2])
-        with col1:
-            st.markdown("**Chọn**")
-        with col2:
-            st.markdown("**Tên file**")
-        with col3:
-            st.markdown("**Domain**")
-        with col4:
-            st.markdown("**URL**")
-        
-        st.markdown("---")
-        
-        # Display PDFs with checkboxes
-        selected_pdfs = []
-        for idx, pdf in enumerate(st.session_state.discovered_pdfs):
-            col1, col2, col3, col4 = st.columns([0.5, 3, 2, 2])
-            with col1:
-                selected = st.checkbox("", key=f"pdf_{idx}", label_visibility="hidden")
-            with col2:
-                st.write(pdf['filename'])
-            with col3:
-                st.write(pdf['domain'])
-            with col4:
-                url_display = pdf['url'][:40] + "..." if len(pdf['url']) > 40 else pdf['url']
-                st.write(url_display)
-            
-            if selected:
-                selected_pdfs.append(pdf)
-        
-        st.markdown("---")
-        
-        # Summary of selection
-        if selected_pdfs:
-            st.info(f"ℹ️ Đã chọn {len(selected_pdfs)} / {len(st.session_state.discovered_pdfs)} file PDF")
+    # Phase 2: PDFs appear as they are discovered and can be selected and downloaded while the scan runs
+    else:
+        download_job = st.session_state.download_job
+        if download_job is None:
+            live = not scan_job.finished
+            st.fragment(discovery_view, run_every=POLL_INTERVAL if live else None)(scan_job, live)
         else:
-            st.warning("⚠️ Chưa chọn file nào")
-        
-        # Download selected PDFs button
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("📥 Download Selected PDFs", type="primary", use_container_width=True, disabled=len(selected_pdfs)==0):
-                # Progress indicators
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                try:
-                    status_text.text(f"🔄 Đang tải {len(selected_pdfs)} file PDF...")
-                    
-                    crawler = st.session_state.crawler_instance
-                    
-                    # Run download for selected PDFs
-                    try:
-                        loop = asyncio.get_event_loop()
-                    except RuntimeError:
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                    
-                    result = loop.run_until_complete(crawler.download_selected_pdfs(selected_pdfs))
-                    
-                    progress_bar.progress(100)
-                    status_text.text("✅ Tải xuống hoàn thành!")
-                    
-                    # Load URL mapping from metadata
-                    url_mapping = {}
-                    metadata_file = Path(CONFIG["metadata_file"])
-                    metadata = {}
-                    if metadata_file.exists():
-                        with open(metadata_file, 'r') as f:
-                            metadata = json.load(f)
-                            url_mapping = metadata.get("downloaded_pdfs", {})
-                    
-                    # Save all results to session state
-                    st.session_state.crawl_results = {
-                        'metadata': crawler.metadata,
-                        'failed_downloads': crawler.failed_downloads,
-                        'run_dir': st.session_state.run_dir,
-                        'output_dir': st.session_state.output_dir,
-                        'timestamp': st.session_state.timestamp,
-                        'url_mapping': url_mapping,
-                        'metadata_file': CONFIG["metadata_file"],
-                        'log_file': CONFIG["log_file"],
-                        'full_metadata': metadata
-                    }
-                    
-                    # Reset discovery state
-                    st.session_state.scan_complete = False
-                    st.session_state.discovered_pdfs = []
-                    
-                    # Trigger display by rerunning
-                    st.rerun()
-                            
-                except Exception as e:
-                    progress_bar.progress(0)
-                    status_text.text("")
-                    st.error(f"❌ Lỗi: {str(e)}")
-                    
-                    # Show log on error
-                    log_file = Path(CONFIG["log_file"])
-                    if log_file.exists():
-                        with st.expander("📝 Chi tiết lỗi (log)"):
-                            with open(log_file, 'r') as f:
-                                st.text(f.read())
-        
-        with col2:
-            if st.button("🔄 Quét lại", use_container_width=True):
-                st.session_state.scan_complete = False
-                st.session_state.discovered_pdfs = []
-                st.session_state.crawler_instance = None
-                st.rerun()
+            live = not download_job.finished
+            st.fragment(download_view, run_every=POLL_INTERVAL if live else None)(download_job, live)
     
     # Display results if crawl has been performed
     if st.session_state.crawl_results is not None:
@@ -317,68 +435,31 @@ def main():
 
             # File search input
             search_terms = st.text_input(
-                "🔍 Tìm kiếm file theo tên và URL (phân cách bằng dấu phẩy)",
+                "🔍 Tìm kiếm file theo tên, URL và tiêu đề liên kết",
                 placeholder="Ví dụ: catalog, manual, guide...",
-                help="Tìm kiếm trong cả tên file và URL gốc. Ví dụ: 'catalog' sẽ tìm cả file có tên catalog và file có URL chứa catalog"
+                help="Tìm kiếm trong tên file, URL gốc, chữ của liên kết và tiêu đề phía trên liên kết. Kết quả khớp nhiều từ hơn được xếp trước"
             )
 
-            # Get all PDF files
-            pdf_files = list(results['output_dir'].rglob("*.pdf"))
-            pdf_files.sort()
+            manifest = load_manifest(results['manifest_file'], results['output_dir'])
 
-            # Parse search terms
-            search_keywords = [term.strip().lower() for term in search_terms.split(',') if term.strip()] if search_terms else []
-
-            # Separate priority files and other files
+            # Ranked matches first, everything else after in path order
+            searching = bool(search_terms.strip())
             priority_files = []
-            other_files = []
-
-            if search_keywords:
-                for pdf_file in pdf_files:
-                    file_name_lower = pdf_file.name.lower()
-
-                    # Get original URL for this file
-                    original_url = ""
-                    for url, filepath in results['url_mapping'].items():
-                        if Path(filepath).name == pdf_file.name:
-                            original_url = url.lower()
-                            break
+            other_files = manifest.entries
 
-                    # Search in both filename and original URL
-                    name_match = any(keyword in file_name_lower for keyword in search_keywords)
-                    url_match = any(keyword in original_url for keyword in search_keywords) if original_url else False
-
-                    if name_match or url_match:
-                        priority_files.append(pdf_file)
-                    else:
-                        other_files.append(pdf_file)
-            else:
-                other_files = pdf_files
+            if searching:
+                hits = load_search_index(results['manifest_file']).search(search_terms, limit=None)
+                priority_files = [manifest.by_path[path] for path, _ in hits if path in manifest.by_path]
+                matched = {entry["path"] for entry in priority_files}
+                other_files = [entry for entry in manifest.entries if entry["path"] not in matched]
 
             # Multi-select for PDF files
             st.subheader("📑 Chọn file PDF để tải xuống")
 
-            selected_files = []
-
             # Priority files section
             if priority_files:
                 st.markdown("### ⭐ File Ưu Tiên (khớp tìm kiếm)")
-                for pdf_file in priority_files:
-                    # Get original URL for this file
-                    original_url = ""
-                    for url, filepath in results['url_mapping'].items():
-                        if Path(filepath).name == pdf_file.name:
-                            original_url = url
-                            break
-
-                    col1, col2 = st.columns([0.05, 0.95])
-                    with col1:
-                        if st.checkbox("Select file", key=f"priority_{pdf_file}", label_visibility="hidden"):
-                            selected_files.append(pdf_file)
-                    with col2:
-                        st.text(f"🎯 {pdf_file.relative_to(results['output_dir'])}")
-                        if original_url:
-                            st.caption(f"🔗 {original_url[:80]}{'...' if len(original_url) > 80 else ''}")
+                render_file_page(priority_files, "🎯", "priority")
 
             # Other files section
             if other_files:
@@ -386,27 +467,13 @@ def main():
                     st.markdown("### 📁 Các File Khác")
                 else:
                     st.markdown("### 📁 Tất Cả Các File")
+                render_file_page(other_files, "📄", "other")
 
-                # Show files in batches to avoid UI issues
-                batch_size = 20
-                for i in range(0, len(other_files), batch_size):
-                    batch = other_files[i:i+batch_size]
-                    for pdf_file in batch:
-                        # Get original URL for this file
-                        original_url = ""
-                        for url, filepath in results['url_mapping'].items():
-                            if Path(filepath).name == pdf_file.name:
-                                original_url = url
-                                break
-
-                        col1, col2 = st.columns([0.05, 0.95])
-                        with col1:
-                            if st.checkbox("Select file", key=f"other_{pdf_file}_{i}", label_visibility="hidden"):
-                                selected_files.append(pdf_file)
-                        with col2:
-                            st.text(f"📄 {pdf_file.relative_to(results['output_dir'])}")
-                            if original_url:
-                                st.caption(f"🔗 {original_url[:80]}{'...' if len(original_url) > 80 else ''}")
+            selected_files = [
+                manifest.file_path(manifest.by_path[path])
+                for path in sorted(st.session_state.selected_paths)
+                if path in manifest.by_path
+            ]
 
             # Summary of selected files
             if selected_files:
@@ -414,83 +481,68 @@ def main():
             else:
                 st.info("ℹ️ Chưa chọn file nào")
 
-            # Initialize session state for download preparation
+            # Initialize session state for download preparation: None, "selected" or "all"
             if 'prepare_download' not in st.session_state:
-                st.session_state.prepare_download = False
+                st.session_state.prepare_download = None
 
-            # Button to prepare downloads
+            # Buttons to prepare downloads; only the requested archive is built
             st.markdown("---")
-            if st.button("📥 Download các file đã chọn", type="primary", use_container_width=True, disabled=len(selected_files) == 0):
-                st.session_state.prepare_download = True
-                st.rerun()
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("📥 Download các file đã chọn", type="primary", use_container_width=True, disabled=len(selected_files) == 0):
+                    st.session_state.prepare_download = "selected"
+                    st.rerun()
+            with col2:
+                if st.button(f"📥 Download tất cả ({len(manifest)} PDFs)", use_container_width=True, disabled=len(manifest) == 0):
+                    st.session_state.prepare_download = "all"
+                    st.rerun()
 
-            # Show download buttons only after user clicks "Prepare Download"
+            # Show the download button only after user clicks "Prepare Download"
             if st.session_state.prepare_download:
                 st.markdown("### 📦 Tải xuống")
-                
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    if selected_files:
-                        # Create zip for selected files
-                        selected_zip_path = results['run_dir'] / "selected_pdfs.zip"
-
-                        # Create temporary directory for selected files
-                        temp_selected_dir = results['run_dir'] / "temp_selected"
-                        temp_selected_dir.mkdir(exist_ok=True)
-
-                        # Copy selected files to temp directory
-                        for pdf_file in selected_files:
-                            dest_path = temp_selected_dir / pdf_file.name
-                            shutil.copy2(pdf_file, dest_path)
-
-                        # Create zip
-                        zip_directory(temp_selected_dir, selected_zip_path)
-
-                        # Download button for selected files
-                        with open(selected_zip_path, 'rb') as f:
-                            st.download_button(
-                                label=f"⬇️ Tải {len(selected_files)} file đã chọn",
-                                data=f,
-                                file_name=f"selected_pdfs_{results['timestamp']}.zip",
-                                mime="application/zip",
-                                use_container_width=True
-                            )
-
-                with col2:
-                    # Download all files button
-                    all_zip_path = results['run_dir'] / "all_pdfs.zip"
-                    zip_directory(results['output_dir'], all_zip_path)
-
-                    with open(all_zip_path, 'rb') as f:
-                        st.download_button(
-                            label=f"⬇️ Tải tất cả ({results['metadata']['pdfs_downloaded']} PDFs)",
-                            data=f,
-                            file_name=f"all_pdfs_{results['timestamp']}.zip",
-                            mime="application/zip",
-                            use_container_width=True
-                        )
-                
+
+                if st.session_state.prepare_download == "selected":
+                    # Zip the selected files in place, without copying them first
+                    entries = unique_names(selected_files)
+                    label = f"⬇️ Tải {len(selected_files)} file đã chọn"
+                    file_name = f"selected_pdfs_{results['timestamp']}.zip"
+                else:
+                    entries = [(manifest.file_path(entry), entry["path"]) for entry in manifest.entries]
+                    label = f"⬇️ Tải tất cả ({len(manifest)} PDFs)"
+                    file_name = f"all_pdfs_{results['timestamp']}.zip"
+
+                st.download_button(
+                    label=label,
+                    data=zip_bytes(
+                        str(results['manifest_file']),
+                        manifest_mtime(results['manifest_file']),
+                        tuple((str(path), name) for path, name in entries)
+                    ),
+                    file_name=file_name,
+                    mime="application/zip",
+                    use_container_width=True
+                )
+
                 # Reset button
                 if st.button("🔄 Chọn lại file", use_container_width=True):
-                    st.session_state.prepare_download = False
+                    st.session_state.prepare_download = None
                     st.rerun()
 
             # File statistics
             st.markdown("---")
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Tổng số file", len(pdf_files))
+                st.metric("Tổng số file", len(manifest))
             with col2:
-                if search_keywords:
+                if searching:
                     st.metric("File Ưu tiên", len(priority_files))
                 else:
                     st.metric("File Ưu tiên", "0")
             with col3:
-                if search_keywords:
+                if searching:
                     st.metric("File khác", len(other_files))
                 else:
-                    st.metric("File khác", len(pdf_files))
+                    st.metric("File khác", len(manifest))
         else:
             st.warning("⚠️ Không tìm thấy PDF nào để tải xuống")
         
@@ -506,6 +558,7 @@ def main():
         st.markdown("---")
         if st.button("🔄 Crawl mới", key="clear_results", use_container_width=True):
             st.session_state.crawl_results = None
+            st.session_state.selected_paths = set()
             st.rerun()
     
     # Footer
@@ -1,19 +1,68 @@
-from flask import Flask, render_template, request, jsonify, send_file, flash
-import asyncio
+from flask import Flask, Response, render_template_string, request, jsonify, flash, redirect, stream_with_context
 from pathlib import Path
 from datetime import datetime
-import zipfile
 import json
-import shutil
 import os
+import time
+import uuid
 from werkzeug.utils import secure_filename
-from pdf_crawler import PDFCrawler, CONFIG
+from crawl_jobs import CrawlJobManager
+from pdf_crawler import CrawlerConfig
+from run_manifest import load_manifest, load_search_index
+from zip_stream import iter_zip, unique_names
 
 app = Flask(__name__)
 app.secret_key = 'pdf_crawler_secret_key'
 
+# Crawls run on a background event-loop thread; requests only submit and poll them
+jobs = CrawlJobManager(max_concurrent_jobs=int(os.environ.get("PDF_CRAWLER_MAX_JOBS", "2")))
+
+# Minimum seconds between two progress messages on one SSE stream
+SSE_MIN_INTERVAL = 0.5
+SSE_KEEPALIVE = 15
+# File names start_crawl gives each run, used for runs found on disk without their job
+MANIFEST_NAME = "pdf_manifest.json"
+OUTPUT_DIR_NAME = "downloaded_pdfs"
+
+def manifest_file_for(run_dir, job=None) -> Path:
+    """Manifest file of job as configured, or of the run in run_dir when there is no job"""
+    if job is not None and job.config["manifest_file"]:
+        return Path(job.config["manifest_file"]).resolve()
+    return run_dir / MANIFEST_NAME
+
+def manifest_for(run_dir, job=None):
+    """Run manifest of job or run_dir, empty while the crawl has not written one"""
+    output_dir = Path(job.config["output_dir"]).resolve() if job is not None else run_dir / OUTPUT_DIR_NAME
+    return load_manifest(manifest_file_for(run_dir, job), output_dir)
+
+def job_files(job):
+    """Downloaded files of a finished job, for the results list"""
+    return manifest_for(run_dir_for(job), job).entries
+
+def job_from_request():
+    job_id = request.args.get('job') or (request.get_json(silent=True) or {}).get('job')
+    return jobs.get(job_id) if job_id else None
+
+def run_dir_for(job):
+    """Run directory of job, or the most recent run when no job was given"""
+    if job is not None:
+        # Absolute, since send_file resolves relative paths against the app root rather than the cwd
+        return Path(job.config["output_dir"]).resolve().parent
+
+    runs_dir = Path("runs")
+    if not runs_dir.exists() or not any(runs_dir.iterdir()):
+        return None
+    return max(runs_dir.iterdir(), key=lambda x: x.stat().st_mtime).resolve()
+
 @app.route('/')
 def index():
+    job = job_from_request()
+    results = None
+    files = []
+    if job is not None and job.status == 'done' and job.summary:
+        results = job.summary["metadata"]
+        files = job_files(job)
+
     return render_template_string('''
 <!DOCTYPE html>
 <html>
@@ -83,7 +132,11 @@ def index():
             <button type="submit" class="btn">🚀 Bắt đầu Crawl</button>
         </form>
 
-        <div id="progress-section" class="hidden">
+        {% if job and job.error %}
+        <div class="status">❌ Lỗi: {{ job.error }}</div>
+        {% endif %}
+
+        <div id="progress-section" class="{{ '' if job and not job.finished else 'hidden' }}">
             <div class="status" id="status-text">🔄 Đang khởi tạo crawler...</div>
             <div class="progress">
                 <div class="progress-bar" id="progress-bar" style="width: 0%"></div>
@@ -126,19 +179,20 @@ def index():
                 <h3>📥 Tải xuống kết quả</h3>
 
                 <div class="search-box">
-                    <label><strong>🔍 Tìm kiếm file theo tên và URL:</strong></label>
+                    <label><strong>🔍 Tìm kiếm file theo tên, URL và tiêu đề liên kết:</strong></label>
                     <input type="text" id="search-input" placeholder="Ví dụ: catalog, manual, guide..." style="width: 100%; padding: 8px; margin-top: 5px;">
-                    <small>Tìm kiếm trong cả tên file và URL gốc. Ví dụ: 'catalog' sẽ tìm cả file có tên catalog và file có URL chứa catalog</small>
+                    <small>Tìm kiếm trong tên file, URL gốc, chữ của liên kết và tiêu đề phía trên liên kết. Kết quả khớp nhiều từ hơn được xếp trước</small>
                 </div>
 
                 <div class="file-list">
                     <div id="file-list">
                         {% for file in files %}
-                        <div class="file-item {{ 'priority' if file.priority else 'normal' }}" data-filename="{{ file.name|lower }}" data-url="{{ file.url|lower }}">
+                        <div class="file-item normal" data-path="{{ file.path }}" data-order="{{ loop.index }}">
                             <input type="checkbox" id="file_{{ loop.index }}" value="{{ file.path }}">
                             <label for="file_{{ loop.index }}">
-                                <strong>{% if file.priority %}🎯 {% else %}📄 {% endif %}{{ file.name }}</strong><br>
+                                <strong>📄 {{ file.name }}</strong><br>
                                 <span class="url-text">🔗 {{ file.url[:80] }}{% if file.url|length > 80 %}...{% endif %}</span>
+                                {% if file.anchor_text %}<br><span class="url-text">🏷️ {{ file.anchor_text }}</span>{% endif %}
                             </label>
                         </div>
                         {% endfor %}
@@ -147,7 +201,7 @@ def index():
 
                 <div style="margin-top: 20px;">
                     <button class="btn" onclick="downloadSelected()">⬇️ Tải file đã chọn</button>
-                    <a href="/download_all" class="btn" style="background: #007bff; text-decoration: none; display: inline-block; text-align: center; margin-left: 10px;">⬇️ Tải tất cả</a>
+                    <a href="/download_all?job={{ job.id }}" class="btn" style="background: #007bff; text-decoration: none; display: inline-block; text-align: center; margin-left: 10px;">⬇️ Tải tất cả</a>
                 </div>
 
                 <div style="margin-top: 10px; display: flex; gap: 20px;">
@@ -167,40 +221,48 @@ def index():
             document.getElementById('status-text').textContent = status;
         }
 
+        let searchTimer = null;
+
         function filterFiles() {
-            const searchTerm = document.getElementById('search-input').value.toLowerCase();
-            const fileItems = document.querySelectorAll('.file-item');
-            let priorityCount = 0;
-            let normalCount = 0;
-
-            fileItems.forEach(item => {
-                const filename = item.dataset.filename;
-                const url = item.dataset.url;
-                const hasKeyword = searchTerm && (filename.includes(searchTerm) || url.includes(searchTerm));
-
-                if (hasKeyword) {
-                    item.classList.add('priority');
-                    item.classList.remove('normal');
-                    item.querySelector('strong').innerHTML = '🎯 ' + item.querySelector('strong').innerHTML.replace(/[🎯📄]\s*/g, '');
-                    priorityCount++;
-                } else if (searchTerm) {
-                    item.classList.add('normal');
-                    item.classList.remove('priority');
-                    item.querySelector('strong').innerHTML = '📄 ' + item.querySelector('strong').innerHTML.replace(/[🎯📄]\s*/g, '');
-                    normalCount++;
-                } else {
-                    item.classList.add('normal');
-                    item.classList.remove('priority');
-                    item.querySelector('strong').innerHTML = '📄 ' + item.querySelector('strong').innerHTML.replace(/[🎯📄]\s*/g, '');
-                    normalCount++;
-                }
-            });
+            // Wait for a pause in typing before asking the server
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(runSearch, 200);
+        }
 
-            document.getElementById('priority-count').textContent = priorityCount;
-            document.getElementById('normal-count').textContent = normalCount;
+        function runSearch() {
+            const query = document.getElementById('search-input').value.trim();
+            const search = query
+                ? fetch(`/search?job={{ job.id if job else "" }}&q=${encodeURIComponent(query)}`).then(r => r.json())
+                : Promise.resolve({paths: []});
+
+            search.then(data => {
+                // Ranked matches first, then the rest in their original order
+                const rank = new Map(data.paths.map((path, i) => [path, i]));
+                const list = document.getElementById('file-list');
+                const items = Array.from(list.querySelectorAll('.file-item'));
+                const position = item => rank.has(item.dataset.path)
+                    ? rank.get(item.dataset.path)
+                    : rank.size + Number(item.dataset.order);
+                items.sort((a, b) => position(a) - position(b));
+
+                items.forEach(item => {
+                    const hit = rank.has(item.dataset.path);
+                    item.classList.toggle('priority', hit);
+                    item.classList.toggle('normal', !hit);
+                    const title = item.querySelector('strong');
+                    title.innerHTML = (hit ? '🎯 ' : '📄 ') + title.innerHTML.replace(/[🎯📄]\s*/g, '');
+                    list.appendChild(item);
+                });
+
+                document.getElementById('priority-count').textContent = rank.size;
+                document.getElementById('normal-count').textContent = items.length - rank.size;
+            });
         }
 
-        document.getElementById('search-input').addEventListener('input', filterFiles);
+        const searchInput = document.getElementById('search-input');
+        if (searchInput) {
+            searchInput.addEventListener('input', filterFiles);
+        }
 
         function downloadSelected() {
             const checkboxes = document.querySelectorAll('input[type="checkbox"]:checked');
@@ -213,7 +275,7 @@ def index():
             fetch('/download_selected', {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({files: fileIds})
+                body: JSON.stringify({files: fileIds, job: '{{ job.id if job else "" }}'})
             }).then(response => response.blob())
             .then(blob => {
                 const url = window.URL.createObjectURL(blob);
@@ -229,10 +291,26 @@ def index():
             document.getElementById('progress-section').classList.remove('hidden');
             updateProgress(10, '🔄 Đang khởi tạo crawler...');
         });
+
+        {% if job and not job.finished %}
+        // Live progress of the running job; reload for the results once it finishes
+        const source = new EventSource('/jobs/{{ job.id }}/events');
+        source.onmessage = function(e) {
+            const job = JSON.parse(e.data);
+            const mb = (job.bytes_downloaded / (1024 * 1024)).toFixed(1);
+            const label = job.status === 'queued' ? '⏳ Đang chờ đến lượt...' :
+                `🔄 ${job.sites_done}/${job.sites_total} site · ${job.pdfs_discovered} PDF · ${job.pdfs_downloaded} đã tải · ${mb} MB`;
+            updateProgress(Math.max(job.progress, 5), label);
+            if (['done', 'failed', 'cancelled'].includes(job.status)) {
+                source.close();
+                window.location.reload();
+            }
+        };
+        {% endif %}
     </script>
 </body>
 </html>
-    ''')
+    ''', job=job, results=results, files=files)
 
 @app.route('/start_crawl', methods=['POST'])
 def start_crawl():
@@ -250,95 +328,107 @@ def start_crawl():
             flash('⚠️ Vui lòng nhập ít nhất một URL')
             return redirect('/')
 
-        # Update config
-        CONFIG["max_pages_per_site"] = max_pages
-        CONFIG["max_concurrent_downloads"] = max_concurrent
-        CONFIG["timeout"] = timeout
-
         # Create unique output directory
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        run_dir = Path(f"runs/run_{timestamp}")
-        output_dir = run_dir / "downloaded_pdfs"
+        run_dir = Path(f"runs/run_{timestamp}_{uuid.uuid4().hex[:6]}")
+        output_dir = run_dir / OUTPUT_DIR_NAME
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Update CONFIG paths
-        CONFIG["output_dir"] = str(output_dir)
-        CONFIG["log_file"] = str(run_dir / "pdf_crawler.log")
-        CONFIG["metadata_file"] = str(run_dir / "pdf_downloads_metadata.json")
-        CONFIG["progress_file"] = str(run_dir / "pdf_crawler_progress.json")
-
-        # Run crawler (synchronous for web app)
-        import nest_asyncio
-        nest_asyncio.apply()
-
-        crawler = PDFCrawler()
-        asyncio.run(crawler.run(urls))
-
-        # Load URL mapping
-        url_mapping = {}
-        metadata_file = Path(CONFIG["metadata_file"])
-        if metadata_file.exists():
-            with open(metadata_file, 'r') as f:
-                metadata = json.load(f)
-                url_mapping = metadata.get("downloaded_pdfs", {})
-
-        # Prepare file list with URLs
-        files = []
-        pdf_files = list(output_dir.rglob("*.pdf"))
-        pdf_files.sort()
-
-        for pdf_file in pdf_files:
-            # Find original URL
-            original_url = ""
-            for url, filepath in url_mapping.items():
-                if Path(filepath).name == pdf_file.name:
-                    original_url = url
-                    break
-
-            files.append({
-                'name': pdf_file.name,
-                'path': str(pdf_file),
-                'url': original_url,
-                'priority': False
-            })
-
-        return render_template_string('''
-<!DOCTYPE html>
-<html>
-<head><title>Processing</title></head>
-<body>
-    <script>
-        // Redirect back to main page with results
-        window.location.href = '/';
-    </script>
-</body>
-</html>
-        ''')
+        # Per-run settings, so concurrent requests never share paths
+        config = CrawlerConfig(
+            max_pages_per_site=max_pages,
+            max_concurrent_downloads=max_concurrent,
+            timeout=timeout,
+            output_dir=str(output_dir),
+            log_file=str(run_dir / "pdf_crawler.log"),
+            metadata_file=str(run_dir / "pdf_downloads_metadata.json"),
+            manifest_file=str(run_dir / MANIFEST_NAME),
+            progress_file=str(run_dir / "pdf_crawler_progress.json"),
+            dead_letter_file=str(run_dir / "pdf_crawler_dead_letter.jsonl")
+        )
+
+        job = jobs.submit(urls, config, mode='download')
+
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify({"job_id": job.id, "status_url": f"/jobs/{job.id}"}), 202
+        return redirect(f'/?job={job.id}')
 
     except Exception as e:
         flash(f'❌ Lỗi: {str(e)}')
         return redirect('/')
 
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.snapshot())
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    if jobs.get(job_id) is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({"cancelled": jobs.cancel(job_id)})
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Server-Sent Events stream of job snapshots, ending once the job has finished"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    def stream():
+        version = None
+        while True:
+            snapshot = job.snapshot()
+            if snapshot["version"] != version:
+                version = snapshot["version"]
+                yield f"data: {json.dumps(snapshot)}\n\n"
+                if job.finished:
+                    return
+                # Coalesce bursts of page events into one message
+                time.sleep(SSE_MIN_INTERVAL)
+            else:
+                yield ": keep-alive\n\n"
+            job.wait_for_change(version, timeout=SSE_KEEPALIVE)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def zip_response(entries, download_name: str):
+    """Stream a zip of entries as it is built; add ?deflate=1 to compress instead of storing"""
+    deflate = request.args.get('deflate') == '1'
+    return Response(
+        stream_with_context(iter_zip(entries, deflate=deflate)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{download_name}"'}
+    )
+
+@app.route('/search')
+def search():
+    """Relative paths of the run's files matching q, best first"""
+    job = job_from_request()
+    latest_run = run_dir_for(job)
+    query = request.args.get('q', '')
+    if latest_run is None or not query.strip():
+        return jsonify({"paths": []})
+
+    index = load_search_index(manifest_file_for(latest_run, job))
+    return jsonify({"paths": [path for path, _ in index.search(query, limit=None)]})
+
 @app.route('/download_all')
 def download_all():
     try:
-        # Find the latest run directory
-        runs_dir = Path("runs")
-        if not runs_dir.exists():
+        job = job_from_request()
+        latest_run = run_dir_for(job)
+        if latest_run is None:
             return "No runs found", 404
-
-        latest_run = max(runs_dir.iterdir(), key=lambda x: x.stat().st_mtime)
-        output_dir = latest_run / "downloaded_pdfs"
-
-        zip_path = latest_run / "all_pdfs.zip"
-
-        # Create zip
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file in output_dir.rglob('*'):
-                if file.is_file():
-                    zipf.write(file, file.relative_to(output_dir))
-
-        return send_file(zip_path, as_attachment=True, download_name=f"all_pdfs_{latest_run.name}.zip")
+        manifest = manifest_for(latest_run, job)
+        entries = [(manifest.file_path(entry), entry["path"]) for entry in manifest.entries]
+        return zip_response(entries, f"all_pdfs_{latest_run.name}.zip")
 
     except Exception as e:
         return f"Error: {str(e)}", 500
@@ -347,31 +437,15 @@ def download_all():
 def download_selected():
     try:
         data = request.get_json()
-        file_paths = data['files']
-
-        # Find the latest run directory
-        runs_dir = Path("runs")
-        latest_run = max(runs_dir.iterdir(), key=lambda x: x.stat().st_mtime)
-
-        # Create temp directory
-        temp_dir = latest_run / "temp_selected"
-        temp_dir.mkdir(exist_ok=True)
-
-        # Copy selected files
-        for file_path in file_paths:
-            src_path = Path(file_path)
-            if src_path.exists():
-                dest_path = temp_dir / src_path.name
-                shutil.copy2(src_path, dest_path)
-
-        # Create zip
-        zip_path = latest_run / "selected_pdfs.zip"
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file in temp_dir.rglob('*'):
-                if file.is_file():
-                    zipf.write(file, file.relative_to(temp_dir))
-
-        return send_file(zip_path, as_attachment=True, download_name="selected_pdfs.zip")
+        job = job_from_request()
+        latest_run = run_dir_for(job)
+        if latest_run is None:
+            return "No runs found", 404
+
+        # Paths are relative to the run's output directory; only files in its manifest are handed out
+        manifest = manifest_for(latest_run, job)
+        files = [manifest.file_path(manifest.by_path[path]) for path in data['files'] if path in manifest.by_path]
+        return zip_response(unique_names(files), "selected_pdfs.zip")
 
     except Exception as e:
         return f"Error: {str(e)}", 500
@@ -0,0 +1,128 @@
+"""Micro-benchmark: single-pass link extraction vs. the old double BeautifulSoup parse.
+
+Usage:
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/bench_link_extraction.py [corpus_dir] [--repeat N]
+
+corpus_dir holds saved pages (*.html / *.htm). The base URL of each page is
+read from a sibling "<name>.url" file when present, otherwise
+https://example.com/<name> is used. Without a corpus a synthetic one is
+generated.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Set, Tuple
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pdf_crawler import SKIPPED_PAGE_EXTENSIONS, extract_links, is_pdf_link  # noqa: E402
+
+
+def bs4_find_pdf_links(html: str, base_url: str) -> Set[str]:
+    pdf_links = set()
+    soup = BeautifulSoup(html, 'html.parser')
+
+    for link in soup.find_all('a', href=True):
+        full_url = urljoin(base_url, link['href'])
+        if is_pdf_link(full_url):
+            pdf_links.add(full_url)
+
+    for tag in soup.find_all(['iframe', 'embed', 'object']):
+        src = tag.get('src') or tag.get('data')
+        if src:
+            full_url = urljoin(base_url, src)
+            if is_pdf_link(full_url):
+                pdf_links.add(full_url)
+
+    return pdf_links
+
+
+def bs4_find_page_links(html: str, base_url: str) -> Set[str]:
+    links = set()
+    base_domain = urlparse(base_url).netloc
+    soup = BeautifulSoup(html, 'html.parser')
+
+    for link in soup.find_all('a', href=True):
+        full_url = urljoin(base_url, link['href'])
+        if urlparse(full_url).netloc == base_domain:
+            full_url = full_url.split('#')[0]
+            if not any(ext in full_url.lower() for ext in SKIPPED_PAGE_EXTENSIONS):
+                links.add(full_url)
+
+    return links
+
+
+def synthetic_corpus(pages: int = 40) -> List[Tuple[str, str]]:
+    corpus = []
+    for i in range(pages):
+        rows = []
+        for j in range(300):
+            rows.append(
+                f'<tr><td class="c{j % 7}"><a href="/section/{i}/item{j}#top">Item {j}</a></td>'
+                f'<td><a href="/files/report_{i}_{j}.pdf">Report &amp; annex {j}</a></td>'
+                f'<td><a href="https://other.example.org/page{j}">External</a></td>'
+                f'<td><img src="/img/{j}.png" alt="thumb"></td></tr>'
+            )
+        html = (
+            '<!DOCTYPE html><html><head><title>Page</title>'
+            '<link rel="stylesheet" href="/style.css"><script src="/app.js"></script></head>'
+            f'<body><h1>Listing {i}</h1><table>{"".join(rows)}</table>'
+            f'<iframe src="/viewer/doc{i}.pdf"></iframe><object data="/download?file=doc{i}pdf"></object>'
+            '</body></html>'
+        )
+        corpus.append((html, f"https://example.com/listing/{i}"))
+    return corpus
+
+
+def load_corpus(corpus_dir: Path) -> List[Tuple[str, str]]:
+    corpus = []
+    for path in sorted(list(corpus_dir.rglob('*.html')) + list(corpus_dir.rglob('*.htm'))):
+        url_file = path.with_suffix('.url')
+        base_url = url_file.read_text().strip() if url_file.exists() else f"https://example.com/{path.name}"
+        corpus.append((path.read_text(errors='ignore'), base_url))
+    return corpus
+
+
+def bench(label: str, func, corpus: List[Tuple[str, str]], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html, base_url in corpus:
+            func(html, base_url)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<32} {best * 1000:10.1f} ms  ({best / len(corpus) * 1000:.2f} ms/page)")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus_dir', nargs='?', type=Path)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus_dir) if args.corpus_dir else synthetic_corpus()
+    if not corpus:
+        print("Corpus is empty")
+        return
+    total_mb = sum(len(html) for html, _ in corpus) / (1024 * 1024)
+    print(f"Corpus: {len(corpus)} pages, {total_mb:.1f} MB")
+
+    mismatches = 0
+    for html, base_url in corpus:
+        pdf_links, page_links = extract_links(html, base_url)
+        if (set(pdf_links), set(page_links)) != (bs4_find_pdf_links(html, base_url), bs4_find_page_links(html, base_url)):
+            mismatches += 1
+    print(f"Pages with differing link sets: {mismatches}")
+
+    baseline = bench("BeautifulSoup x2 (old)", lambda h, u: (bs4_find_pdf_links(h, u), bs4_find_page_links(h, u)), corpus, args.repeat)
+    single = bench("LinkExtractor single pass", extract_links, corpus, args.repeat)
+    print(f"Speedup: {baseline / single:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+from typing import Dict, Optional
+
+
+class CrawlEvent:
+    """Base class for events yielded by PDFCrawler.stream()"""
+
+    kind = "event"
+    __slots__ = ()
+
+    def to_dict(self) -> Dict:
+        data = {"event": self.kind}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                data[name] = getattr(self, name)
+        return data
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{k}={v!r}" for k, v in self.to_dict().items() if k != 'event')
+        return f"{type(self).__name__}({fields})"
+
+
+class PageFetched(CrawlEvent):
+    """A page was fetched; ok is False when no HTML page could be read"""
+
+    kind = "page_fetched"
+    __slots__ = ('url', 'site', 'ok', 'pdf_links', 'page_links')
+
+    def __init__(self, url: str, site: str, ok: bool, pdf_links: int = 0, page_links: int = 0):
+        self.url = url
+        self.site = site
+        self.ok = ok
+        self.pdf_links = pdf_links
+        self.page_links = page_links
+
+
+class PDFDiscovered(CrawlEvent):
+    """A PDF was found; record holds the discover-mode entry, including probe results when verified"""
+
+    kind = "pdf_discovered"
+    __slots__ = ('url', 'site', 'record')
+
+    def __init__(self, url: str, site: str, record: Optional[Dict] = None):
+        self.url = url
+        self.site = site
+        self.record = record
+
+
+class DownloadProgress(CrawlEvent):
+    kind = "download_progress"
+    __slots__ = ('url', 'bytes_done', 'total_bytes')
+
+    def __init__(self, url: str, bytes_done: int, total_bytes: Optional[int]):
+        self.url = url
+        self.bytes_done = bytes_done
+        self.total_bytes = total_bytes
+
+
+class PDFDownloaded(CrawlEvent):
+    kind = "pdf_downloaded"
+    __slots__ = ('url', 'path', 'sha256')
+
+    def __init__(self, url: str, path: str, sha256: Optional[str]):
+        self.url = url
+        self.path = path
+        self.sha256 = sha256
+
+
+class DownloadFailed(CrawlEvent):
+    kind = "download_failed"
+    __slots__ = ('url', 'site', 'error', 'attempts')
+
+    def __init__(self, url: str, site: str, error: str, attempts: int):
+        self.url = url
+        self.site = site
+        self.error = error
+        self.attempts = attempts
+
+
+class SiteDone(CrawlEvent):
+    kind = "site_done"
+    __slots__ = ('site', 'pages_crawled', 'pdfs_found')
+
+    def __init__(self, site: str, pages_crawled: int, pdfs_found: int):
+        self.site = site
+        self.pages_crawled = pages_crawled
+        self.pdfs_found = pdfs_found
+
+
+class RunFinished(CrawlEvent):
+    """Last event of a stream, carrying the same summary run() returns"""
+
+    kind = "run_finished"
+    __slots__ = ('summary',)
+
+    def __init__(self, summary: Dict):
+        self.summary = summary
@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from crawl_events import (CrawlEvent, DownloadFailed, DownloadProgress, PageFetched, PDFDiscovered, PDFDownloaded,
+                          RunFinished, SiteDone)
+from pdf_crawler import CrawlerConfig, PDFCrawler
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ('done', 'failed', 'cancelled')
+
+
+class CrawlJob:
+    """State of one background crawl, updated from the job loop and read from request threads"""
+
+    def __init__(self, urls: List[str], config: CrawlerConfig, mode: str,
+                 selection: Optional[List[Dict]] = None, crawler: Optional[PDFCrawler] = None,
+                 keep_crawler: bool = False, after: Optional['CrawlJob'] = None):
+        self.id = uuid.uuid4().hex
+        self.urls = urls
+        self.config = config
+        self.mode = mode
+        # Discovered records to download instead of crawling urls
+        self.selection = selection
+        # Set while the job runs, and kept afterwards with keep_crawler; only touch it through CrawlJobManager.call
+        self.crawler = crawler
+        self.keep_crawler = keep_crawler
+        # Job that must finish first, since both use the same crawler
+        self.after = after
+        self.status = 'queued'
+        self.error: Optional[str] = None
+        self.summary: Optional[Dict] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+
+        self.sites: Dict[str, Dict] = {url: {"pages": 0, "pdfs": 0, "done": False} for url in urls}
+        self.pdfs_discovered = 0
+        self.pdfs_downloaded = 0
+        self.pdfs_failed = 0
+        self.bytes_downloaded = 0
+        # Discover-mode records in the order they were found
+        self.discovered: List[Dict] = []
+        # url -> [bytes_done, total_bytes] for downloads still in flight
+        self.downloads: Dict[str, List] = {}
+
+        self.version = 0
+        self.changed = threading.Condition()
+        # The asyncio task running the job on the manager's loop
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def set_status(self, status: str, error: Optional[str] = None):
+        with self.changed:
+            self.status = status
+            self.error = error
+            if status == 'running':
+                self.started_at = datetime.now().isoformat()
+            elif status in FINISHED_STATUSES:
+                self.finished_at = datetime.now().isoformat()
+                self.downloads.clear()
+            self.touch()
+
+    def apply(self, event: CrawlEvent):
+        with self.changed:
+            if isinstance(event, PageFetched):
+                self.site(event.site)["pages"] += 1
+            elif isinstance(event, PDFDiscovered):
+                self.pdfs_discovered += 1
+                self.site(event.site)["pdfs"] += 1
+                if event.record is not None:
+                    self.discovered.append(event.record)
+            elif isinstance(event, DownloadProgress):
+                self.downloads[event.url] = [event.bytes_done, event.total_bytes]
+            elif isinstance(event, PDFDownloaded):
+                self.downloads.pop(event.url, None)
+                self.pdfs_downloaded += 1
+                try:
+                    self.bytes_downloaded += os.path.getsize(event.path)
+                except OSError:
+                    pass
+            elif isinstance(event, DownloadFailed):
+                self.downloads.pop(event.url, None)
+                self.pdfs_failed += 1
+            elif isinstance(event, SiteDone):
+                self.site(event.site)["done"] = True
+            elif isinstance(event, RunFinished):
+                self.summary = event.summary
+            self.touch()
+
+    def discovered_since(self, start: int = 0) -> List[Dict]:
+        """Discovered records from position start on, safe to call while the job runs"""
+        with self.changed:
+            return self.discovered[start:]
+
+    def site(self, url: str) -> Dict:
+        return self.sites.setdefault(url, {"pages": 0, "pdfs": 0, "done": False})
+
+    def touch(self):
+        """Bump the version and wake anyone waiting in wait_for_change; call with self.changed held"""
+        self.version += 1
+        self.changed.notify_all()
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """Block until the job changes past version or timeout passes; returns the current version"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def snapshot(self) -> Dict:
+        with self.changed:
+            sites_done = sum(1 for site in self.sites.values() if site["done"])
+            if self.selection is not None:
+                # A selected download has no sites; progress follows the files instead
+                finished_files = self.pdfs_downloaded + self.pdfs_failed
+                progress = round(100 * finished_files / len(self.selection)) if self.selection else 100
+            else:
+                progress = round(100 * sites_done / len(self.sites)) if self.sites else 100
+            return {
+                "id": self.id,
+                "status": self.status,
+                "mode": self.mode,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "sites_total": len(self.sites),
+                "sites_done": sites_done,
+                "progress": progress,
+                "sites": {url: dict(site) for url, site in self.sites.items()},
+                "pdfs_discovered": self.pdfs_discovered,
+                "pdfs_downloaded": self.pdfs_downloaded,
+                "pdfs_failed": self.pdfs_failed,
+                "bytes_downloaded": self.bytes_downloaded + sum(done for done, _ in self.downloads.values()),
+                "downloads": {url: {"bytes_done": done, "total_bytes": total}
+                              for url, (done, total) in self.downloads.items()},
+                "version": self.version,
+            }
+
+
+class CrawlJobManager:
+    """Runs crawl jobs on one background event-loop thread, at most max_concurrent_jobs at a time.
+
+    submit() returns immediately; callers poll CrawlJob.snapshot() or block in wait_for_change().
+    """
+
+    def __init__(self, max_concurrent_jobs: int = 2, max_finished_jobs: int = 100):
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: Dict[str, CrawlJob] = {}
+        self.lock = threading.Lock()
+
+        self.loop = asyncio.new_event_loop()
+        self.slots = asyncio.Semaphore(max_concurrent_jobs)
+        self.thread = threading.Thread(target=self.loop.run_forever, name='crawl-jobs', daemon=True)
+        self.thread.start()
+
+    def submit(self, urls: List[str], config: CrawlerConfig, mode: str = 'download',
+               keep_crawler: bool = False) -> CrawlJob:
+        """Queue a crawl; with keep_crawler the finished job keeps its PDFCrawler for follow-up jobs"""
+        return self.enqueue(CrawlJob(urls, config, mode, keep_crawler=keep_crawler))
+
+    def submit_selected(self, source: CrawlJob, selection: List[Dict]) -> CrawlJob:
+        """Queue a download of records discovered by source, on source's crawler so results land in its run.
+
+        The download starts once source has finished.
+        """
+        return self.enqueue(CrawlJob([], source.config, 'download', selection, source.crawler,
+                                     source.keep_crawler, after=source))
+
+    def enqueue(self, job: CrawlJob) -> CrawlJob:
+        with self.lock:
+            self.prune()
+            self.jobs[job.id] = job
+        # Created on the loop and kept, so follow-up jobs can await the task itself
+        job.task = self.call(self.loop.create_task, self.run_job(job))
+        return job
+
+    def get(self, job_id: str) -> Optional[CrawlJob]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or job.finished or not self.call(job.task.cancel):
+            return False
+        if job.status == 'queued':
+            # A job cancelled before it started never reaches its own CancelledError handler
+            job.set_status('cancelled')
+        return True
+
+    def release(self, job: CrawlJob):
+        """Drop the crawler a keep_crawler job holds once its results are no longer needed"""
+        def release():
+            job.keep_crawler = False
+            if job.finished:
+                job.crawler = None
+
+        self.call(release)
+
+    def call(self, func, *args, timeout: Optional[float] = None):
+        """Run func(*args) on the job loop, where crawlers change their state, and return its result"""
+        async def call():
+            return func(*args)
+
+        return asyncio.run_coroutine_threadsafe(call(), self.loop).result(timeout)
+
+    async def run_job(self, job: CrawlJob):
+        try:
+            if job.after is not None:
+                # Wait until the other job's task has unwound, not just been asked to stop;
+                # asyncio.wait never raises, whether it succeeded, failed or was cancelled
+                await asyncio.wait([job.after.task])
+                job.crawler = job.crawler or job.after.crawler
+            async with self.slots:
+                job.set_status('running')
+                if job.crawler is None:
+                    job.crawler = PDFCrawler(job.config)
+                if job.selection is not None:
+                    events = job.crawler.stream_selected(job.selection)
+                else:
+                    events = job.crawler.stream(job.urls, job.mode)
+                async for event in events:
+                    job.apply(event)
+            job.set_status('done')
+        except asyncio.CancelledError:
+            job.set_status('cancelled')
+            raise
+        except Exception as e:
+            logger.exception(f"Crawl job {job.id} failed")
+            job.set_status('failed', error=str(e))
+        finally:
+            if not job.keep_crawler:
+                job.crawler = None
+
+    def prune(self):
+        """Forget the oldest finished jobs beyond max_finished_jobs; call with self.lock held"""
+        finished = [job for job in self.jobs.values() if job.finished]
+        for job in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            # Callers may still hold the job; its crawler is no longer reachable through the manager
+            job.crawler = None
+            del self.jobs[job.id]
@@ -0,0 +1,494 @@
+import hashlib
+import heapq
+import json
+import logging
+import math
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS visited_urls (
+    url TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS pdfs (
+    url TEXT PRIMARY KEY,
+    path TEXT,
+    sha256 TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pdfs_sha256 ON pdfs(sha256);
+
+CREATE TABLE IF NOT EXISTS downloaded_keys (
+    url TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS pdf_keys (
+    key TEXT PRIMARY KEY,
+    url TEXT
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS pdf_context (
+    url TEXT PRIMARY KEY,
+    data TEXT
+);
+
+CREATE TABLE IF NOT EXISTS discovered_pdfs (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    source_site TEXT,
+    domain TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_discovered_url ON discovered_pdfs(url);
+CREATE INDEX IF NOT EXISTS idx_discovered_domain ON discovered_pdfs(domain);
+
+CREATE TABLE IF NOT EXISTS failures (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    source_site TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_failures_url ON failures(url);
+
+CREATE TABLE IF NOT EXISTS sites (
+    site TEXT PRIMARY KEY,
+    pages_crawled INTEGER NOT NULL DEFAULT 0,
+    pdfs_found INTEGER NOT NULL DEFAULT 0,
+    finished_at TEXT
+);
+"""
+
+
+class SQLiteStateStore:
+    """SQLite (WAL mode) backend for crawl state.
+
+    The collections it hands out mimic the set/dict/list interfaces PDFCrawler
+    already uses, so the crawler code is unchanged. Writes are buffered per
+    collection and flushed in batches, which keeps memory bounded by
+    batch_size instead of by the size of the crawl.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+        # Streamlit reruns the script on different threads, so the connection
+        # must be usable from any of them; the lock serialises access
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.collections: List["SQLiteCollection"] = []
+
+        self.visited_urls = SQLiteURLSet(self, "visited_urls")
+        self.downloaded_pdfs = SQLiteColumnDict(self, "pdfs", "url", "path")
+        self.pdf_hashes = SQLiteColumnDict(self, "pdfs", "url", "sha256")
+        self.downloaded_keys = SQLiteURLSet(self, "downloaded_keys")
+        self.pdf_keys = SQLiteColumnDict(self, "pdf_keys", "key", "url")
+        self.pdf_context = SQLiteJSONDict(self, "pdf_context", "url", "data")
+        self.discovered_pdfs = SQLiteRecordList(self, "discovered_pdfs", ("url", "source_site", "domain"))
+        self.failed_downloads = SQLiteRecordList(self, "failures", ("url", "source_site"))
+
+    def query(self, sql: str, params=()) -> List[tuple]:
+        self.flush()
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def flush(self):
+        with self.lock:
+            for collection in self.collections:
+                collection.write_pending()
+            self.conn.commit()
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.conn.close()
+
+    def finished_sites(self) -> List[str]:
+        return [row[0] for row in self.query("SELECT site FROM sites WHERE finished_at IS NOT NULL")]
+
+    def record_site(self, site: str, pages_crawled: int, pdfs_found: int):
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO sites(site, pages_crawled, pdfs_found, finished_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(site) DO UPDATE SET pages_crawled=excluded.pages_crawled, "
+                "pdfs_found=excluded.pdfs_found, finished_at=excluded.finished_at",
+                (site, pages_crawled, pdfs_found, datetime.now().isoformat())
+            )
+        self.flush()
+
+    def reset_run(self):
+        """Forget visited pages and claimed PDFs; they only deduplicate within one run"""
+        self.visited_urls.pending.clear()
+        self.pdf_keys.pending.clear()
+        with self.lock:
+            self.conn.execute("DELETE FROM visited_urls")
+            self.conn.execute("DELETE FROM pdf_keys")
+            self.conn.commit()
+
+
+class SQLiteCollection(ABC):
+    def __init__(self, store: SQLiteStateStore, table: str):
+        self.store = store
+        self.table = table
+        store.collections.append(self)
+
+    @abstractmethod
+    def write_pending(self):
+        """Write buffered changes; called by the store with its lock held, before it commits"""
+
+    def maybe_flush(self, pending_size: int):
+        if pending_size >= self.store.batch_size:
+            self.store.flush()
+
+
+class SQLiteURLSet(SQLiteCollection):
+    """Set of URL strings stored in a single-column table"""
+
+    def __init__(self, store: SQLiteStateStore, table: str):
+        super().__init__(store, table)
+        self.pending: set = set()
+
+    def add(self, url: str):
+        self.pending.add(url)
+        self.maybe_flush(len(self.pending))
+
+    def __contains__(self, url: str) -> bool:
+        if url in self.pending:
+            return True
+        with self.store.lock:
+            return self.store.conn.execute(f"SELECT 1 FROM {self.table} WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.store.query(f"SELECT COUNT(*) FROM {self.table}")[0][0]
+
+    def __iter__(self) -> Iterator[str]:
+        return (row[0] for row in self.store.query(f"SELECT url FROM {self.table}"))
+
+    def write_pending(self):
+        if self.pending:
+            self.store.conn.executemany(
+                f"INSERT OR IGNORE INTO {self.table}(url) VALUES (?)", ((url,) for url in self.pending)
+            )
+            self.pending.clear()
+
+
+class SQLiteColumnDict(SQLiteCollection):
+    """Mapping from a table's key column to one of its value columns; NULL values count as absent"""
+
+    def __init__(self, store: SQLiteStateStore, table: str, key: str, column: str):
+        super().__init__(store, table)
+        self.key = key
+        self.column = column
+        self.pending: Dict[str, str] = {}
+
+    def __setitem__(self, key: str, value: str):
+        self.pending[key] = value
+        self.maybe_flush(len(self.pending))
+
+    def __getitem__(self, key: str) -> str:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default=None):
+        if key in self.pending:
+            return self.pending[key]
+        with self.store.lock:
+            row = self.store.conn.execute(
+                f"SELECT {self.column} FROM {self.table} WHERE {self.key} = ?", (key,)
+            ).fetchone()
+        return row[0] if row and row[0] is not None else default
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def update(self, other: Dict[str, str]):
+        for key, value in other.items():
+            self[key] = value
+
+    def __len__(self) -> int:
+        return self.store.query(f"SELECT COUNT(*) FROM {self.table} WHERE {self.column} IS NOT NULL")[0][0]
+
+    def items(self) -> Iterator[tuple]:
+        return iter(self.store.query(
+            f"SELECT {self.key}, {self.column} FROM {self.table} WHERE {self.column} IS NOT NULL"
+        ))
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, _ in self.items())
+
+    def write_pending(self):
+        if self.pending:
+            self.store.conn.executemany(
+                f"INSERT INTO {self.table}({self.key}, {self.column}) VALUES (?, ?) "
+                f"ON CONFLICT({self.key}) DO UPDATE SET {self.column} = excluded.{self.column}",
+                self.pending.items()
+            )
+            self.pending.clear()
+
+
+class SQLiteJSONDict(SQLiteColumnDict):
+    """SQLiteColumnDict whose values are JSON-encoded; values read back are copies"""
+
+    def __setitem__(self, key: str, value):
+        super().__setitem__(key, json.dumps(value))
+
+    def get(self, key: str, default=None):
+        value = super().get(key)
+        return json.loads(value) if value is not None else default
+
+    def items(self) -> Iterator[tuple]:
+        return ((key, json.loads(value)) for key, value in super().items())
+
+
+class SQLiteRecordList(SQLiteCollection):
+    """Append-only list of dict records; selected fields are stored in indexed columns"""
+
+    def __init__(self, store: SQLiteStateStore, table: str, columns: tuple):
+        super().__init__(store, table)
+        self.columns = columns
+        self.pending: List[Dict] = []
+
+    def append(self, record: Dict):
+        self.pending.append(record)
+        self.maybe_flush(len(self.pending))
+
+    def __len__(self) -> int:
+        with self.store.lock:
+            count = self.store.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        return count + len(self.pending)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.page(0, None))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            return self.page(start, max(0, stop - start))[::step]
+        if index < 0:
+            index += len(self)
+        records = self.page(index, 1)
+        if not records:
+            raise IndexError(index)
+        return records[0]
+
+    def page(self, offset: int, limit: Optional[int], **filters) -> List[Dict]:
+        """Return records in insertion order, optionally filtered on indexed columns"""
+        where = ""
+        params: list = []
+        if filters:
+            unknown = set(filters) - set(self.columns)
+            if unknown:
+                raise ValueError(f"Cannot filter {self.table} on {', '.join(sorted(unknown))}")
+            where = " WHERE " + " AND ".join(f"{column} = ?" for column in filters)
+            params = list(filters.values())
+
+        sql = f"SELECT data FROM {self.table}{where} ORDER BY id LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        return [json.loads(row[0]) for row in self.store.query(sql, params)]
+
+    def write_pending(self):
+        if self.pending:
+            placeholders = ", ".join("?" for _ in range(len(self.columns) + 1))
+            self.store.conn.executemany(
+                f"INSERT INTO {self.table}({', '.join(self.columns)}, data) VALUES ({placeholders})",
+                ([*(record.get(column) for column in self.columns), json.dumps(record)] for record in self.pending)
+            )
+            self.pending.clear()
+
+
+def normalize_url(url: str) -> str:
+    """Lower-case scheme and host and drop the fragment so trivial variants hash alike"""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ''))
+
+
+def url_digest(url: str, size: int = 8) -> bytes:
+    return hashlib.blake2b(normalize_url(url).encode('utf-8', errors='surrogatepass'), digest_size=size).digest()
+
+
+class DigestURLSet:
+    """Exact seen-set of 64-bit URL digests packed into sorted arrays.
+
+    New digests collect in a small Python set; when it fills up it is sorted
+    into an array('Q') run, and runs of similar size are merged like a binary
+    counter (an LSM tree), so each URL costs about 8 bytes. Lookups bisect
+    each run. Distinct URLs collide with probability ~n^2 / 2^65.
+    """
+
+    def __init__(self, buffer_size: int = 65536):
+        self.buffer_size = buffer_size
+        self.buffer: set = set()
+        self.runs: List[array] = []
+        self.count = 0
+
+    @staticmethod
+    def key(url: str) -> int:
+        return int.from_bytes(url_digest(url), 'big')
+
+    def add(self, url: str):
+        key = self.key(url)
+        if self._contains_key(key):
+            return
+        self.buffer.add(key)
+        self.count += 1
+        if len(self.buffer) >= self.buffer_size:
+            self._spill()
+
+    def __contains__(self, url: str) -> bool:
+        return self._contains_key(self.key(url))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _contains_key(self, key: int) -> bool:
+        if key in self.buffer:
+            return True
+        for run in self.runs:
+            index = bisect_left(run, key)
+            if index < len(run) and run[index] == key:
+                return True
+        return False
+
+    def _spill(self):
+        run = array('Q', sorted(self.buffer))
+        self.buffer.clear()
+        # Merge while the newest run is at least as large as the one before it
+        while self.runs and len(self.runs[-1]) <= len(run):
+            run = array('Q', heapq.merge(self.runs.pop(), run))
+        self.runs.append(run)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def positions(self, digest: bytes) -> Iterator[int]:
+        # Kirsch-Mitzenmacher double hashing from one 128-bit digest
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, digest: bytes):
+        for position in self.positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(digest))
+
+
+class ScalableBloomFilter:
+    """Bloom filter that grows by adding larger, tighter filters as it fills.
+
+    Filter i holds initial_capacity * 2^i URLs at error_rate * (1 - r) * r^i,
+    which keeps the compound false-positive rate under error_rate. A false
+    positive means a page is treated as already visited.
+    """
+
+    tightening_ratio = 0.5
+
+    def __init__(self, error_rate: float = 0.001, initial_capacity: int = 100000):
+        self.error_rate = error_rate
+        self.initial_capacity = initial_capacity
+        self.filters: List[BloomFilter] = []
+        self.count = 0
+
+    def add(self, url: str):
+        digest = url_digest(url, 16)
+        if any(digest in bloom for bloom in self.filters):
+            return
+        if not self.filters or self.filters[-1].count >= self.filters[-1].capacity:
+            index = len(self.filters)
+            self.filters.append(BloomFilter(
+                self.initial_capacity * 2 ** index,
+                self.error_rate * (1 - self.tightening_ratio) * self.tightening_ratio ** index
+            ))
+        self.filters[-1].add(digest)
+        self.count += 1
+
+    def __contains__(self, url: str) -> bool:
+        digest = url_digest(url, 16)
+        return any(digest in bloom for bloom in self.filters)
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class ShardedSeenSet:
+    """Seen-set split into one shard per host, so a host's entries can be dropped once it is crawled.
+
+    Shards are reference counted: crawl_site opens the shard for its start URL
+    and drops it when done, and the shard is freed once no site on that host
+    is still being crawled.
+    """
+
+    def __init__(self, shard_factory: Callable[[], object]):
+        self.shard_factory = shard_factory
+        self.shards: Dict[str, object] = {}
+        self.refs: Dict[str, int] = {}
+
+    @staticmethod
+    def host(url: str) -> str:
+        return urlsplit(url).netloc.lower()
+
+    def shard(self, url: str, create: bool = False):
+        host = self.host(url)
+        shard = self.shards.get(host)
+        if shard is None and create:
+            shard = self.shards[host] = self.shard_factory()
+        return shard
+
+    def add(self, url: str):
+        self.shard(url, create=True).add(url)
+
+    def __contains__(self, url: str) -> bool:
+        shard = self.shard(url)
+        return shard is not None and url in shard
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards.values())
+
+    def open_shard(self, url: str):
+        host = self.host(url)
+        self.refs[host] = self.refs.get(host, 0) + 1
+
+    def drop_shard(self, url: str):
+        host = self.host(url)
+        self.refs[host] = self.refs.get(host, 1) - 1
+        if self.refs[host] <= 0:
+            self.refs.pop(host, None)
+            self.shards.pop(host, None)
+
+
+def create_seen_set(kind: str, error_rate: float = 0.001, sharded: bool = False):
+    """Build the visited-URL set: "set" (full URL strings), "digest" (exact 64-bit digests) or "bloom" """
+    factories = {
+        "set": set,
+        "digest": DigestURLSet,
+        "bloom": lambda: ScalableBloomFilter(error_rate),
+    }
+    if kind not in factories:
+        raise ValueError(f"Unknown seen_filter: {kind}")
+
+    factory = factories[kind]
+    return ShardedSeenSet(factory) if sharded else factory()
@@ -1,56 +1,877 @@
 import asyncio
+import email.utils
 import hashlib
+import itertools
 import json
 import os
+import random
 import re
+import shutil
+import sqlite3
+import sys
+import time
+import zlib
+from collections.abc import Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager, nullcontext
 from pathlib import Path
-from typing import Set, Dict, List
-from urllib.parse import urljoin, urlparse
+from types import MappingProxyType
+from typing import AsyncIterator, Set, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlencode, urljoin, urlparse, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
 from datetime import datetime
+from html.parser import HTMLParser
 import aiohttp
 import aiofiles
-from bs4 import BeautifulSoup
+from multidict import CIMultiDict
 from tqdm import tqdm
 import logging
 
+from crawl_events import (CrawlEvent, DownloadFailed, DownloadProgress, PageFetched, PDFDiscovered, PDFDownloaded,
+                          RunFinished, SiteDone)
+from crawl_state import ShardedSeenSet, SQLiteStateStore, create_seen_set
+from run_manifest import RunManifest
+from search_index import SearchIndex
+from site_discovery import SitemapStream, SitemapTooLarge, parse_robots, robots_url, sitemap_urls_for
+
 CONFIG = {
     "input_file": "./crawl_data.txt",
     "output_dir": "downloaded_pdfs",
     "max_concurrent_downloads": 5,
     "max_pages_per_site": 50,  
+    "workers_per_site": 4,
+    "parse_executor": None,  # None (parse on the event loop), "process", "thread" or "auto"
+    "parse_workers": None,  # defaults to the number of CPU cores
+    "parse_queue_size": None,  # max pages being fetched or waiting for a parser, defaults to 2 * parse_workers
+    "host_initial_delay": 0.25,  # seconds between request starts to one host, adapted per host
+    "host_min_delay": 0.05,
+    "host_max_delay": 60.0,
+    "host_initial_concurrency": 2,  # requests in flight per host, grown additively up to host_max_concurrency
+    "host_max_concurrency": 8,
+    # Page fetching and PDF downloading use separate connection pools
+    "page_pool_limit": 20,
+    "page_pool_limit_per_host": 8,
+    "page_keepalive_timeout": 15,
+    "pdf_pool_limit": None,  # defaults to max_concurrent_downloads
+    "pdf_pool_limit_per_host": 4,
+    "pdf_keepalive_timeout": 30,
+    "dns_cache_ttl": 300,
+    "retry_max_attempts": 3,  # attempts per page fetch or PDF download, including the first
+    "retry_base_delay": 1.0,
+    "retry_max_delay": 30.0,
+    "retry_statuses": [408, 425, 429, 500, 502, 503, 504],
+    "download_chunk_size": 64 * 1024,
+    "pipeline_downloads": True,  # download mode: start downloads while sites are still being crawled
+    "download_queue_size": 100,  # found-but-not-downloaded PDFs before page crawling waits for downloads
+    "max_pdf_size_mb": None,  # abort downloads larger than this, None for no limit
     "timeout": 60,
+    # PDF bodies have no total timeout, so large files on slow links can finish; these bound each stall instead
+    "download_connect_timeout": 30,
+    "download_read_timeout": 60,  # seconds without receiving any data
     "user_agent": "Mozilla/5.0 (compatible; PDFCrawler/1.0)",
     "log_file": "pdf_crawler.log",
     "metadata_file": "pdf_downloads_metadata.json",
+    "manifest_file": "pdf_manifest.json",  # downloaded files indexed by relative path and URL, for result views
     "progress_file": "pdf_crawler_progress.json",
+    "dead_letter_file": "pdf_crawler_dead_letter.jsonl",
+    "progress_compact_min_events": 10000,  # journal lines before progress_file is compacted into a snapshot
+    "state_backend": "memory",  # "memory" or "sqlite" for crawls too large to keep in RAM
+    "state_db": "pdf_crawler_state.db",
+    "state_batch_size": 500,  # buffered writes per table before they are flushed to SQLite
+    # Visited-URL set: "set" (full URL strings), "digest" (exact, ~9 bytes per URL) or "bloom"
+    # (probabilistic, ~4 bytes per URL at 0.1%); anything but "set" also replaces the SQLite visited table
+    "seen_filter": "set",
+    "seen_filter_error_rate": 0.001,
+    "seen_filter_sharded": False,  # one shard per host, dropped when the host's sites are finished
+    # URL canonicalisation applied before visited/frontier checks and PDF dedup; "*" suffix matches a prefix
+    "canonical_strip_params": ["utm_*", "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "_ga", "_gl",
+                               "yclid", "igshid", "_hsenc", "_hsmi"],
+    "canonical_strip_www": True,
+    "canonical_strip_trailing_slash": True,
+    # robots.txt and sitemap discovery before the HTML crawl of each site
+    "respect_robots": True,  # honour Disallow and Crawl-delay for robots_user_agent
+    "robots_user_agent": "PDFCrawler",
+    "robots_max_crawl_delay": 30.0,
+    "sitemap_discovery": True,  # seed PDFs and pages from robots.txt Sitemap entries or /sitemap.xml
+    "sitemap_skip_crawl": False,  # skip the HTML crawl of a site whose sitemaps already listed PDFs
+    "sitemap_max_files": 20,  # sitemaps (including index children) read per site
+    "sitemap_max_bytes": 50 * 1024 * 1024,  # per sitemap after decompression, the protocol's own limit
+    "sitemap_seed_pages": 200,  # best-scored sitemap pages added to the frontier
+    "sitemap_max_pdfs": 1000,  # sitemap PDFs taken per site, None for no limit
+    # Discover mode: check each PDF link with HEAD (or a 1 KB Range GET for the %PDF magic) before listing it
+    "verify_pdfs": False,
+    "verify_concurrency": 16,
+    "verify_timeout": 15,
+    "live_search_index": False,  # index PDFs as they are found so search_pdfs works while a crawl runs
+    # Crawl PDF-likely pages first: links are scored on depth, anchor text, path keywords and parent PDF yield;
+    # a keyword matches words in the path or anchor that start with it
+    "frontier_priority": True,
+    "frontier_keywords": ["document", "publication", "report", "download", "paper", "pdf", "librar", "resource",
+                          "archive", "file", "research", "whitepaper", "minutes", "agenda", "form", "manual",
+                          "guide", "brochure", "datasheet", "catalog", "policy", "policies"],
+    "frontier_negative_keywords": ["news", "blog", "event", "tag", "author", "login", "signin", "register", "cart",
+                                   "checkout", "search", "calendar", "comment", "share", "feed", "career", "job"],
+    "http_cache_file": "pdf_crawler_http_cache.db",  # SQLite, shared across runs; None disables conditional requests
+    "http_cache_max_entries": 200000,  # least recently written URLs beyond this are dropped, None for no limit
+    "blob_dir": "pdf_blobs",  # content-addressed PDF store shared across runs, None stores files per URL only
 }
 
-# Configure logging with duplicate prevention
+
+class CrawlerConfig(Mapping):
+    """Immutable settings for one PDFCrawler, read like CONFIG (config["timeout"]).
+
+    Starts from the module-level CONFIG defaults as they are when the config is built;
+    keyword arguments override them and unknown keys are rejected. List values are
+    stored as tuples so nothing can be changed through them either.
+    """
+
+    def __init__(self, **overrides):
+        unknown = set(overrides) - set(CONFIG)
+        if unknown:
+            raise TypeError(f"Unknown crawler settings: {', '.join(sorted(unknown))}")
+
+        settings = {**CONFIG, **overrides}
+        self._settings = MappingProxyType({
+            key: tuple(value) if isinstance(value, list) else value
+            for key, value in settings.items()
+        })
+
+    def __getitem__(self, key: str):
+        return self._settings[key]
+
+    def __iter__(self):
+        return iter(self._settings)
+
+    def __len__(self) -> int:
+        return len(self._settings)
+
+    def __repr__(self) -> str:
+        return f"CrawlerConfig({dict(self._settings)!r})"
+
+    def replace(self, **overrides) -> "CrawlerConfig":
+        """Return a copy with some settings changed"""
+        return CrawlerConfig(**{**self._settings, **overrides})
+
+
+# Module logger: console output only, each crawler adds its own log file (see create_run_logger)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
+LOG_FORMATTER = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 
 # Only add handlers if they don't already exist
 if not logger.handlers:
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    
-    # File handler
-    file_handler = logging.FileHandler(CONFIG["log_file"])
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
-    # Stream handler
     stream_handler = logging.StreamHandler()
-    stream_handler.setFormatter(formatter)
+    stream_handler.setFormatter(LOG_FORMATTER)
     logger.addHandler(stream_handler)
 
 
+def create_run_logger(log_file: Optional[str]) -> logging.Logger:
+    """Logger for one crawler writing to its own log_file and propagating to the console logger.
+
+    It is not registered with the logging manager, so it is freed together with its crawler.
+    """
+    run_logger = logging.Logger(f"{__name__}.run", logging.INFO)
+    run_logger.parent = logger
+    if log_file:
+        file_handler = logging.FileHandler(log_file, delay=True)
+        file_handler.setFormatter(LOG_FORMATTER)
+        run_logger.addHandler(file_handler)
+    return run_logger
+
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Bytes between DownloadProgress events of one download
+PROGRESS_EVENT_BYTES = 1024 * 1024
+
+
+class URLCanonicalizer:
+    """Map URL variants that serve the same resource onto one dedup key.
+
+    Lower-cases scheme and host, drops default ports, the fragment, tracking
+    query params and (optionally) a leading "www." and trailing slashes, and
+    sorts the remaining query params. The key is only used for deduplication;
+    pages and PDFs are still fetched from the URL as found.
+    """
+
+    def __init__(self, strip_params: List[str], strip_www: bool = True, strip_trailing_slash: bool = True):
+        self.exact_params = {p.lower() for p in strip_params if not p.endswith('*')}
+        self.param_prefixes = tuple(p[:-1].lower() for p in strip_params if p.endswith('*'))
+        self.strip_www = strip_www
+        self.strip_trailing_slash = strip_trailing_slash
+
+    def is_tracking_param(self, name: str) -> bool:
+        name = name.lower()
+        return name in self.exact_params or (bool(self.param_prefixes) and name.startswith(self.param_prefixes))
+
+    def __call__(self, url: str) -> str:
+        try:
+            parts = urlsplit(url)
+            port = parts.port
+        except ValueError:
+            return url
+
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or '').rstrip('.')
+        if self.strip_www and host.startswith('www.'):
+            host = host[4:]
+        if ':' in host:
+            host = f"[{host}]"
+        if port is not None and port != DEFAULT_PORTS.get(scheme):
+            host = f"{host}:{port}"
+        if parts.username:
+            userinfo = parts.username + (f":{parts.password}" if parts.password else '')
+            host = f"{userinfo}@{host}"
+
+        path = parts.path or '/'
+        if self.strip_trailing_slash and len(path) > 1:
+            path = path.rstrip('/') or '/'
+
+        query = parts.query
+        if query:
+            params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if not self.is_tracking_param(k)]
+            query = urlencode(sorted(params))
+
+        return urlunsplit((scheme, host, path, query, ''))
+
+
+SKIPPED_PAGE_EXTENSIONS = ('.jpg', '.png', '.gif', '.css', '.js', '.xml')
+
+
+def is_pdf_link(url: str) -> bool:
+    """Check if URL points to a PDF"""
+    url_lower = url.lower()
+
+    # Check file extension
+    if url_lower.endswith('.pdf'):
+        return True
+
+    # Check query parameters
+    if 'pdf' in url_lower and any(param in url_lower for param in ['download', 'file', 'doc']):
+        return True
+
+    return False
+
+
+MAX_ANCHOR_TEXT = 200
+
+
+class LinkExtractor(HTMLParser):
+    """Streaming tokenizer collecting PDF links and same-domain page links in one pass.
+
+    Page links map to the anchor text they were linked with, which the frontier uses for scoring.
+    PDF links map to their context: {"anchor": link text, "heading": the nearest heading above the link}.
+    """
+
+    HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.base_domain = urlparse(base_url).netloc
+        self.pdf_links: Dict[str, Dict[str, str]] = {}
+        self.page_links: Dict[str, str] = {}
+        self.anchor_url: Optional[str] = None
+        self.anchor_pdf: Optional[str] = None
+        self.anchor_text: List[str] = []
+        self.heading = ''
+        self.heading_text: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self.close_anchor()
+            attributes = dict(attrs)
+            href = attributes.get('href')
+            if href is None:
+                return
+
+            self.anchor_text = [attributes.get('title') or attributes.get('aria-label') or '']
+            full_url = urljoin(self.base_url, href)
+            if is_pdf_link(full_url):
+                self.add_pdf_link(full_url)
+                self.anchor_pdf = full_url
+
+            if urlparse(full_url).netloc == self.base_domain:
+                full_url = full_url.split('#')[0]
+
+                if not any(ext in full_url.lower() for ext in SKIPPED_PAGE_EXTENSIONS):
+                    self.page_links.setdefault(full_url, '')
+                    self.anchor_url = full_url
+
+        elif tag in ('iframe', 'embed', 'object'):
+            attributes = dict(attrs)
+            src = attributes.get('src') or attributes.get('data')
+            if src:
+                full_url = urljoin(self.base_url, src)
+                if is_pdf_link(full_url):
+                    self.add_pdf_link(full_url, attributes.get('title') or '')
+
+        elif tag in self.HEADING_TAGS:
+            self.heading_text = []
+
+    def handle_data(self, data):
+        if self.anchor_url is not None or self.anchor_pdf is not None:
+            self.anchor_text.append(data)
+        if self.heading_text is not None:
+            self.heading_text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'a':
+            self.close_anchor()
+        elif tag in self.HEADING_TAGS and self.heading_text is not None:
+            self.heading = ' '.join(' '.join(self.heading_text).split())[:MAX_ANCHOR_TEXT]
+            self.heading_text = None
+
+    def close(self):
+        super().close()
+        self.close_anchor()
+
+    def add_pdf_link(self, url: str, anchor: str = ''):
+        context = self.pdf_links.setdefault(url, {"anchor": '', "heading": self.heading})
+        if anchor:
+            context["anchor"] = merge_text(context["anchor"], anchor)
+
+    def close_anchor(self):
+        if self.anchor_url is None and self.anchor_pdf is None:
+            return
+
+        text = ' '.join(' '.join(self.anchor_text).split())
+        if text:
+            if self.anchor_url is not None:
+                self.page_links[self.anchor_url] = merge_text(self.page_links[self.anchor_url], text)
+            if self.anchor_pdf is not None:
+                context = self.pdf_links[self.anchor_pdf]
+                context["anchor"] = merge_text(context["anchor"], text)
+
+        self.anchor_url = None
+        self.anchor_pdf = None
+        self.anchor_text = []
+
+
+def merge_text(existing: str, text: str) -> str:
+    """Append another sighting's anchor text, keeping it short and free of repeats"""
+    if text in existing:
+        return existing
+    return f"{existing} {text}".strip()[:MAX_ANCHOR_TEXT]
+
+
+def extract_links(html: str, base_url: str, log: logging.Logger = logger) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str]]:
+    """Return (pdf_links, page_links) found in html, parsing the document once.
+
+    pdf_links maps each PDF URL to its anchor text and heading; page_links maps each same-domain
+    page URL to its anchor text. Parse errors are logged to log and the links found so far returned.
+    """
+    pdf_links, page_links, error = parse_links(html, base_url)
+    if error:
+        log.error(f"Error parsing HTML for {base_url}: {error}")
+    return pdf_links, page_links
+
+
+def parse_links(html: str, base_url: str) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str], Optional[str]]:
+    """extract_links returning the parse error instead of logging it, for executor workers without the crawler's logger"""
+    extractor = LinkExtractor(base_url)
+    error = None
+
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except Exception as e:
+        error = str(e)
+
+    return extractor.pdf_links, extractor.page_links, error
+
+
+class FrontierScorer:
+    """Score same-site page links so the crawl spends its page budget on PDF-likely pages first"""
+
+    PATH_KEYWORD_WEIGHT = 3.0
+    ANCHOR_KEYWORD_WEIGHT = 2.0
+    NEGATIVE_WEIGHT = -3.0
+    DEPTH_WEIGHT = -1.0
+    PARENT_YIELD_WEIGHT = 0.5
+    MAX_PARENT_YIELD = 10
+
+    def __init__(self, keywords: List[str], negative_keywords: List[str]):
+        self.keywords = [k.lower() for k in keywords]
+        self.negative_keywords = [k.lower() for k in negative_keywords]
+
+    WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+    def count(self, words: List[str], keywords: List[str]) -> int:
+        """Keywords that start one of words, so "librar" matches "libraries" but "search" misses "research" """
+        return sum(1 for keyword in keywords if any(word.startswith(keyword) for word in words))
+
+    def score(self, url: str, anchor_text: str = '', depth: int = 0, parent_pdf_yield: int = 0) -> float:
+        path = self.WORD_PATTERN.findall(urlparse(url).path.lower())
+        anchor = self.WORD_PATTERN.findall(anchor_text.lower())
+
+        score = self.PATH_KEYWORD_WEIGHT * min(self.count(path, self.keywords), 2)
+        score += self.ANCHOR_KEYWORD_WEIGHT * min(self.count(anchor, self.keywords), 2)
+        score += self.NEGATIVE_WEIGHT * min(self.count(path, self.negative_keywords) + self.count(anchor, self.negative_keywords), 2)
+        score += self.DEPTH_WEIGHT * depth
+        score += self.PARENT_YIELD_WEIGHT * min(parent_pdf_yield, self.MAX_PARENT_YIELD)
+        return score
+
+
+def create_parse_executor(kind: str, workers: int) -> Executor:
+    """Build the executor used to run extract_links off the event loop"""
+    if kind == 'auto':
+        # Free-threaded builds can parse in threads without fighting over the GIL
+        gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+        kind = 'process' if gil_enabled else 'thread'
+
+    if kind == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+    if kind == 'thread':
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pdf-parse')
+
+    raise ValueError(f"Unknown parse_executor: {kind}")
+
+
+def link_or_copy(src: Path, dst: Path):
+    """Hardlink src to dst, falling back to a symlink and then a copy"""
+    if dst.exists() or dst.is_symlink():
+        dst.unlink()
+    try:
+        os.link(src, dst)
+    except OSError:
+        try:
+            os.symlink(src.resolve(), dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+
+def hash_file(path: Path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest
+
+
+HTTP_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_cache (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    path TEXT,
+    size INTEGER,
+    links TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_http_cache_updated ON http_cache(updated_at);
+"""
+
+
+class HTTPCache:
+    """Persistent cache of HTTP validators (ETag, Last-Modified, content hash) keyed by URL.
+
+    PDF entries point at the downloaded file; page entries keep the extracted links as JSON,
+    so a 304 or an unchanged body can be answered without parsing the page again.
+
+    Backed by SQLite and read one URL at a time, so nothing is loaded up front. Writes are
+    buffered and upserted row by row on save(), which lets crawlers sharing the file merge
+    their entries instead of overwriting each other's; beyond max_entries the least recently
+    written entries are dropped.
+    """
+
+    FIELDS = ("etag", "last_modified", "content_hash", "path", "size", "links")
+
+    def __init__(self, path: Optional[str], max_entries: Optional[int] = None, log: logging.Logger = logger):
+        self.path = path
+        self.max_entries = max_entries
+        self.logger = log
+        self.pending: Dict[str, Dict] = {}
+        self.conn: Optional[sqlite3.Connection] = None
+
+        if path:
+            try:
+                # Saves run on the event loop thread, lookups may come from worker threads
+                self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+                self.conn.execute("PRAGMA journal_mode=WAL")
+                self.conn.executescript(HTTP_CACHE_SCHEMA)
+                columns = {row[1] for row in self.conn.execute("PRAGMA table_info(http_cache)")}
+                if "links" not in columns:
+                    # Cache files written before page links were stored
+                    self.conn.execute("ALTER TABLE http_cache ADD COLUMN links TEXT")
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.logger.error(f"Failed to open HTTP cache {path}: {e}")
+                self.conn = None
+
+    def get(self, url: str) -> Optional[Dict]:
+        if url in self.pending:
+            return self.pending[url]
+        if self.conn is None:
+            return None
+        row = self.conn.execute(
+            f"SELECT {', '.join(self.FIELDS)} FROM http_cache WHERE url = ?", (url,)
+        ).fetchone()
+        return dict(zip(self.FIELDS, row)) if row else None
+
+    def put(self, url: str, response_headers, **entry):
+        if self.conn is None:
+            return
+        # A 304 may omit the validators; keep the ones the entry already had
+        entry["etag"] = response_headers.get('ETag') or entry.get("etag") or ''
+        entry["last_modified"] = response_headers.get('Last-Modified') or entry.get("last_modified") or ''
+        self.pending[url] = {field: entry.get(field) for field in self.FIELDS}
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers['If-None-Match'] = entry["etag"]
+            if entry.get("last_modified"):
+                headers['If-Modified-Since'] = entry["last_modified"]
+        return headers
+
+    def save(self):
+        if self.conn is None or not self.pending:
+            return
+        now = time.time()
+        try:
+            self.conn.executemany(
+                f"INSERT INTO http_cache(url, {', '.join(self.FIELDS)}, updated_at) VALUES ({', '.join('?' * (len(self.FIELDS) + 2))}) "
+                f"ON CONFLICT(url) DO UPDATE SET "
+                f"{', '.join(f'{field}=excluded.{field}' for field in self.FIELDS)}, updated_at=excluded.updated_at",
+                [(url, *(entry[field] for field in self.FIELDS), now) for url, entry in self.pending.items()]
+            )
+            if self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM http_cache WHERE url IN "
+                    "(SELECT url FROM http_cache ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self.conn.commit()
+            self.pending.clear()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            self.logger.error(f"Failed to save HTTP cache: {e}")
+
+
+BACKOFF_STATUSES = {429, 502, 503, 504}
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date"""
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - datetime.now(retry_at.tzinfo).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostState:
+    def __init__(self, delay: float, concurrency: float):
+        self.delay = delay
+        self.min_delay = 0.0
+        self.concurrency = concurrency
+        # Requests in flight per connection pool ('page' or 'pdf'), each capped by concurrency
+        self.in_flight: Dict[str, int] = {}
+        self.next_start = 0.0
+        self.condition = asyncio.Condition()
+
+
+class HostSlot:
+    """A request slot on one host; record() feeds the response back into the host's pacing"""
+
+    def __init__(self, scheduler: "HostScheduler", state: HostState):
+        self.scheduler = scheduler
+        self.state = state
+        self.recorded = False
+
+    def record(self, status: int, headers=None):
+        self.recorded = True
+        if status in BACKOFF_STATUSES:
+            self.scheduler.back_off(self.state, retry_after_seconds(headers))
+        else:
+            self.scheduler.speed_up(self.state)
+
+
+class HostScheduler:
+    """Adaptive per-host politeness shared by page fetches and PDF downloads.
+
+    Request starts to a host are spaced by a per-host delay and the number in
+    flight is capped by a per-host concurrency limit, counted separately for the
+    page and PDF pools so slow downloads never hold up page fetches. Successful responses
+    shrink the delay and grow the limit additively; 429/5xx overload responses
+    and connection errors double the delay, halve the limit (AIMD) and honour
+    Retry-After.
+    """
+
+    def __init__(self, initial_delay: float, min_delay: float, max_delay: float,
+                 initial_concurrency: int, max_concurrency: int):
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.hosts: Dict[str, HostState] = {}
+
+    def host_state(self, url: str) -> HostState:
+        host = urlparse(url).netloc.lower()
+        state = self.hosts.get(host)
+        if state is None:
+            state = HostState(self.initial_delay, self.initial_concurrency)
+            self.hosts[host] = state
+        return state
+
+    @asynccontextmanager
+    async def slot(self, url: str, pool: str = 'page'):
+        state = self.host_state(url)
+
+        async with state.condition:
+            await state.condition.wait_for(lambda: state.in_flight.get(pool, 0) < max(1, int(state.concurrency)))
+            state.in_flight[pool] = state.in_flight.get(pool, 0) + 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            start = max(now, state.next_start)
+            state.next_start = start + state.delay
+            if start > now:
+                await asyncio.sleep(start - now)
+
+            slot = HostSlot(self, state)
+            try:
+                yield slot
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if not slot.recorded:
+                    self.back_off(state, None)
+                raise
+        finally:
+            async with state.condition:
+                state.in_flight[pool] -= 1
+                state.condition.notify_all()
+
+    def set_min_delay(self, url: str, delay: float):
+        """Never pace a host faster than delay, e.g. its robots.txt Crawl-delay"""
+        state = self.host_state(url)
+        state.min_delay = min(delay, self.max_delay)
+        state.delay = max(state.delay, state.min_delay)
+
+    def speed_up(self, state: HostState):
+        state.delay = max(self.min_delay, state.min_delay, state.delay * 0.8)
+        state.concurrency = min(self.max_concurrency, state.concurrency + 1 / state.concurrency)
+
+    def back_off(self, state: HostState, retry_after: Optional[float]):
+        state.delay = min(self.max_delay, max(self.min_delay, state.min_delay, state.delay * 2))
+        state.concurrency = max(1.0, state.concurrency / 2)
+        if retry_after:
+            now = asyncio.get_running_loop().time()
+            state.next_start = max(state.next_start, now + min(retry_after, self.max_delay))
+
+
+class PoolStats:
+    """Live occupancy of one connection pool, collected through aiohttp tracing.
+
+    A connection stays in use until the response body has been read or released, long after
+    on_request_end (which fires once headers arrive), so in-flight counts come from the
+    connections the connector has handed out rather than from request hooks.
+    """
+
+    def __init__(self, name: str, limit: int, limit_per_host: int, connector: aiohttp.BaseConnector):
+        self.name = name
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.connector = connector
+        self.peak_in_flight = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.requests = 0
+        self.wait_time = 0.0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self.on_request_start)
+        trace_config.on_connection_create_end.append(self.on_connection_acquired)
+        trace_config.on_connection_reuseconn.append(self.on_connection_acquired)
+        trace_config.on_connection_queued_start.append(self.on_queued_start)
+        trace_config.on_connection_queued_end.append(self.on_queued_end)
+        return trace_config
+
+    @property
+    def in_flight(self) -> int:
+        # aiohttp has no public count of acquired connections
+        return len(self.connector._acquired)
+
+    async def on_request_start(self, session, context, params):
+        self.requests += 1
+
+    async def on_connection_acquired(self, session, context, params):
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    async def on_queued_start(self, session, context, params):
+        context.queued_at = asyncio.get_running_loop().time()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+
+    async def on_queued_end(self, session, context, params):
+        self.waiting -= 1
+        self.wait_time += asyncio.get_running_loop().time() - context.queued_at
+
+    def snapshot(self) -> Dict:
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "waiting_for_connection": self.waiting,
+            "peak_waiting_for_connection": self.peak_waiting,
+            "requests": self.requests,
+            "total_wait_s": round(self.wait_time, 3)
+        }
+
+
+class DownloadError(Exception):
+    """A failed download attempt, with the details the retry policy needs"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None,
+                 cause: Optional[BaseException] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.cause = cause
+
+
+class RetryPolicy:
+    """Decides whether a failed request is retried and how long to wait before the next attempt"""
+
+    retryable_exceptions = (aiohttp.ClientError, asyncio.TimeoutError)
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float, retry_statuses):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = set(retry_statuses)
+
+    def should_retry(self, attempt: int, status: Optional[int] = None, error: Optional[BaseException] = None) -> bool:
+        if attempt >= self.max_attempts:
+            return False
+        if error is not None:
+            return isinstance(error, self.retryable_exceptions)
+        return status in self.retry_statuses
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Exponential backoff with full jitter, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class ProgressJournal:
+    """Append-only JSONL journal of download progress.
+
+    Every state change is one appended line, so checkpointing costs O(1)
+    regardless of run size. Once the journal holds more than
+    max(min_events, 2 * live entries) lines it is compacted into a single
+    snapshot line, written to a temp file and atomically renamed.
+    """
+
+    def __init__(self, path: str, min_events: int, log: logging.Logger = logger):
+        self.path = Path(path)
+        self.min_events = min_events
+        self.events = 0
+        self.logger = log
+
+    def append(self, *events: Dict):
+        try:
+            with open(self.path, 'a') as f:
+                for event in events:
+                    f.write(json.dumps(event) + '\n')
+            self.events += len(events)
+        except Exception as e:
+            self.logger.error(f"Failed to append to progress journal: {e}")
+
+    def replay(self) -> List[Dict]:
+        """Read all events; a legacy single-document progress file is returned as one snapshot"""
+        if not self.path.exists():
+            return []
+
+        with open(self.path, 'r') as f:
+            first_line = f.readline()
+            legacy = None
+            if first_line.strip() == '{':
+                f.seek(0)
+                legacy = json.load(f)
+
+            if legacy is not None:
+                # Rewrite a progress file from before the journal as a journal snapshot
+                self.compact(legacy)
+                return [{"event": "snapshot", **legacy}]
+
+            events = []
+            for line in [first_line, *f]:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A crash mid-append leaves at most one truncated line
+                    self.logger.warning(f"Skipping truncated progress journal line: {line[:100]}")
+
+        self.drop_torn_tail()
+        self.events = len(events)
+        return events
+
+    def drop_torn_tail(self):
+        """Cut the file back to its last newline, so an append after a crash starts on a line of its own"""
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                step = min(64 * 1024, position)
+                position -= step
+                f.seek(position)
+                newline = f.read(step).rfind(b'\n')
+                if newline != -1:
+                    position += newline + 1
+                    break
+            if position != end:
+                f.truncate(position)
+
+    def needs_compaction(self, live_entries: int) -> bool:
+        return self.events > max(self.min_events, 2 * live_entries)
+
+    def compact(self, snapshot: Dict):
+        try:
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w') as f:
+                f.write(json.dumps({"event": "snapshot", **snapshot}) + '\n')
+            os.replace(tmp_path, self.path)
+            self.events = 1
+        except Exception as e:
+            self.logger.error(f"Failed to compact progress journal: {e}")
+
+
 class PDFCrawler:
-    def __init__(self):
-        self.output_dir = Path(CONFIG["output_dir"])
+    def __init__(self, config: Optional[CrawlerConfig] = None):
+        # Without an explicit config the crawler snapshots CONFIG as it is now
+        self.config = config if config is not None else CrawlerConfig()
+        self.logger = create_run_logger(self.config["log_file"])
+
+        self.output_dir = Path(self.config["output_dir"])
         self.output_dir.mkdir(exist_ok=True)
 
         self.visited_urls: Set[str] = set()
         self.downloaded_pdfs: Dict[str, str] = {}
+        # Canonical URLs of downloaded PDFs, so variants of a downloaded URL are not fetched again
+        self.downloaded_keys: Set[str] = set()
+        self.partial_downloads: Dict[str, Dict] = {}
         self.discovered_pdfs: List[Dict] = []
         self.failed_downloads: List[Dict] = []
         self.metadata: Dict = {
@@ -58,71 +879,289 @@ class PDFCrawler:
             "pdfs_found": 0,
             "pdfs_downloaded": 0,
             "pdfs_failed": 0,
+            "pages_not_modified": 0,
+            "pdfs_not_modified": 0,
+            "pdfs_deduplicated": 0,
+            "dedup_saved_mb": 0.0,
+            "canonical_page_dedup_hits": 0,
+            "canonical_pdf_dedup_hits": 0,
+            "sitemap_pdfs": 0,
+            "robots_disallowed": 0,
+            "pdfs_rejected_by_probe": 0,
             "total_size_mb": 0.0
         }
+        self.http_cache = HTTPCache(self.config["http_cache_file"], self.config["http_cache_max_entries"], self.logger)
+        self.journal = ProgressJournal(self.config["progress_file"], self.config["progress_compact_min_events"], self.logger)
+        self.blob_dir = Path(self.config["blob_dir"]) if self.config["blob_dir"] else None
+        self.canonicalize = URLCanonicalizer(
+            self.config["canonical_strip_params"],
+            self.config["canonical_strip_www"],
+            self.config["canonical_strip_trailing_slash"]
+        )
+        # Canonical key -> URL of every PDF claimed this run, so each is listed and downloaded once
+        self.pdf_keys: Dict[str, str] = {}
+        self.download_queue: Optional[asyncio.Queue] = None
+        # Set while stream() is consuming this crawler's events
+        self.event_queue: Optional[asyncio.Queue] = None
+        self.pending_downloads: Dict[str, int] = {}
+        self.downloads_done: Optional[asyncio.Condition] = None
+        # Discover mode: PDFs are recorded (and probed) on this session as they are claimed
+        self.discovery_session: Optional[aiohttp.ClientSession] = None
+        self.discovery_tasks: Dict[str, Dict[str, asyncio.Task]] = {}
+        self.verify_slots: Optional[asyncio.Semaphore] = None
+        self.robots: Dict[str, Optional[RobotFileParser]] = {}
+        self.frontier_scorer = FrontierScorer(self.config["frontier_keywords"], self.config["frontier_negative_keywords"])
+        self.pdf_hashes: Dict[str, str] = {}
+        # Anchor text and heading each PDF was linked with, for discovery records and the manifest
+        self.pdf_context: Dict[str, Dict[str, str]] = {}
+        # Only kept when live_search_index is set; finished runs are searched through the manifest
+        self.search_index: Optional[SearchIndex] = SearchIndex() if self.config["live_search_index"] else None
+
+        self.scheduler = HostScheduler(
+            self.config["host_initial_delay"],
+            self.config["host_min_delay"],
+            self.config["host_max_delay"],
+            self.config["host_initial_concurrency"],
+            self.config["host_max_concurrency"]
+        )
+        self.retry_policy = RetryPolicy(
+            self.config["retry_max_attempts"],
+            self.config["retry_base_delay"],
+            self.config["retry_max_delay"],
+            self.config["retry_statuses"]
+        )
+        self.download_timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=self.config["download_connect_timeout"],
+            sock_read=self.config["download_read_timeout"]
+        )
+        self.pools: Dict[str, PoolStats] = {}
+        self.parse_executor: Optional[Executor] = None
+        self.parse_slots: Optional[asyncio.Semaphore] = None
+
+        self.state: Optional[SQLiteStateStore] = None
+        if self.config["state_backend"] == 'sqlite':
+            self.state = SQLiteStateStore(self.config["state_db"], self.config["state_batch_size"])
+            self.visited_urls = self.state.visited_urls
+            self.downloaded_pdfs = self.state.downloaded_pdfs
+            self.downloaded_keys = self.state.downloaded_keys
+            self.pdf_hashes = self.state.pdf_hashes
+            self.discovered_pdfs = self.state.discovered_pdfs
+            self.failed_downloads = self.state.failed_downloads
+            self.pdf_keys = self.state.pdf_keys
+            self.pdf_context = self.state.pdf_context
+            if not len(self.downloaded_keys):
+                # State databases written before canonical keys were stored
+                for url in self.downloaded_pdfs:
+                    self.downloaded_keys.add(self.canonicalize(url))
+            self.logger.info(f"Using SQLite crawl state at {self.config['state_db']}")
+
+        if self.config["seen_filter"] != 'set' or self.config["seen_filter_sharded"]:
+            self.visited_urls = create_seen_set(
+                self.config["seen_filter"],
+                self.config["seen_filter_error_rate"],
+                self.config["seen_filter_sharded"]
+            )
 
         self.load_progress()
 
     def load_progress(self):
-        progress_file = Path(CONFIG["progress_file"])
-        if progress_file.exists():
-            try:
-                with open(progress_file, 'r') as f:
-                    data = json.load(f)
-                    self.downloaded_pdfs = data.get("downloaded_pdfs", {})
-                    self.metadata = data.get("metadata", self.metadata)
-                    logger.info(f"Resumed: {len(self.downloaded_pdfs)} PDFs already downloaded")
-            except Exception as e:
-                logger.error(f"Failed to load progress: {e}")
-
-    def save_progress(self):
         try:
-            with open(CONFIG["progress_file"], 'w') as f:
-                json.dump({
-                    "downloaded_pdfs": self.downloaded_pdfs,
-                    "metadata": self.metadata
-                }, f, indent=2)
+            events = self.journal.replay()
         except Exception as e:
-            logger.error(f"Failed to save progress: {e}")
+            self.logger.error(f"Failed to load progress: {e}")
+            return
+
+        for event in events:
+            kind = event.get("event")
+            if kind == "snapshot":
+                self.downloaded_pdfs.update(event.get("downloaded_pdfs", {}))
+                self.pdf_hashes.update(event.get("pdf_hashes", {}))
+                for url in event.get("downloaded_pdfs", {}):
+                    self.downloaded_keys.add(self.canonicalize(url))
+                self.partial_downloads = event.get("partial_downloads", {})
+                self.metadata.update(event.get("metadata", {}))
+            elif kind == "downloaded":
+                self.downloaded_pdfs[event["url"]] = event["path"]
+                self.downloaded_keys.add(self.canonicalize(event["url"]))
+                if event.get("sha256"):
+                    self.pdf_hashes[event["url"]] = event["sha256"]
+                self.partial_downloads.pop(event["url"], None)
+            elif kind == "partial":
+                self.partial_downloads[event["url"]] = event["partial"]
+            elif kind == "partial_dropped":
+                self.partial_downloads.pop(event["url"], None)
+            elif kind == "metadata":
+                self.metadata.update(event["metadata"])
+
+        if events:
+            self.logger.info(f"Resumed: {len(self.downloaded_pdfs)} PDFs already downloaded, "
+                        f"{len(self.partial_downloads)} partial downloads")
+
+    def save_progress(self):
+        """Checkpoint the run: journal the metadata and compact the journal when it has grown"""
+        self.journal.append({"event": "metadata", "metadata": self.metadata})
+
+        if self.state is not None:
+            # Downloads live in the state database; the journal only carries partials and metadata
+            self.state.flush()
+            if self.journal.needs_compaction(len(self.partial_downloads)):
+                self.journal.compact({"partial_downloads": self.partial_downloads, "metadata": self.metadata})
+        elif self.journal.needs_compaction(len(self.downloaded_pdfs) + len(self.partial_downloads)):
+            self.journal.compact({
+                "downloaded_pdfs": self.downloaded_pdfs,
+                "pdf_hashes": self.pdf_hashes,
+                "partial_downloads": self.partial_downloads,
+                "metadata": self.metadata
+            })
+
+        self.http_cache.save()
+
+    def emit(self, event: CrawlEvent):
+        if self.event_queue is not None:
+            self.event_queue.put_nowait(event)
+
+    def mark_downloaded(self, pdf_url: str, filepath: Path, content_hash: Optional[str]):
+        self.emit(PDFDownloaded(pdf_url, str(filepath), content_hash))
+        self.downloaded_pdfs[pdf_url] = str(filepath)
+        self.downloaded_keys.add(self.canonicalize(pdf_url))
+        if content_hash:
+            self.pdf_hashes[pdf_url] = content_hash
+        if self.state is None:
+            self.partial_downloads.pop(pdf_url, None)
+            self.journal.append({"event": "downloaded", "url": pdf_url, "path": str(filepath), "sha256": content_hash})
+        else:
+            self.drop_partial(pdf_url)
+
+    def set_partial(self, pdf_url: str, partial: Dict):
+        self.partial_downloads[pdf_url] = partial
+        self.journal.append({"event": "partial", "url": pdf_url, "partial": partial})
+
+    def drop_partial(self, pdf_url: str):
+        if self.partial_downloads.pop(pdf_url, None) is not None:
+            self.journal.append({"event": "partial_dropped", "url": pdf_url})
 
     async def fetch_page(self, session: aiohttp.ClientSession, url: str) -> str:
-        try:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=CONFIG["timeout"])) as response:
-                if response.status == 200:
-                    content_type = response.headers.get('Content-Type', '').lower()
-
-                    if 'pdf' in content_type:
-                        logger.debug(f"Direct PDF link detected: {url}")
-                        return ""
-
-                    try:
-                        return await response.text(errors='ignore')
-                    except UnicodeDecodeError:
-                        logger.warning(f"Encoding error for {url}, skipping")
-                        return ""
-                else:
-                    logger.warning(f"HTTP {response.status} for {url}")
-                    return ""
-        except aiohttp.ClientError as e:
-            logger.warning(f"Client error fetching {url}: {e}")
-            return ""
-        except Exception as e:
-            logger.debug(f"Error fetching {url}: {e}")
-            return ""
+        _, html, _ = await self.request_page(session, url)
+        return html
+
+    async def request_page(self, session: aiohttp.ClientSession, url: str, headers: Optional[Dict] = None) -> Tuple[int, str, CIMultiDict]:
+        """GET a page, returning (status, html, response headers); html is empty unless an HTML page was served.
+
+        Headers keep aiohttp's case-insensitive lookup, since servers differ on e.g. ETag vs Etag.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with self.scheduler.slot(url) as slot, \
+                        session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=self.config["timeout"])) as response:
+                    slot.record(response.status, response.headers)
+                    if self.retry_policy.should_retry(attempt, status=response.status):
+                        delay = self.retry_policy.backoff(attempt, retry_after_seconds(response.headers))
+                        self.logger.info(f"HTTP {response.status} for {url}, retrying in {delay:.1f}s")
+                    elif response.status == 200:
+                        content_type = response.headers.get('Content-Type', '').lower()
+
+                        if 'pdf' in content_type:
+                            self.logger.debug(f"Direct PDF link detected: {url}")
+                            return response.status, "", CIMultiDict(response.headers)
+
+                        try:
+                            return response.status, await response.text(errors='ignore'), CIMultiDict(response.headers)
+                        except UnicodeDecodeError:
+                            self.logger.warning(f"Encoding error for {url}, skipping")
+                            return response.status, "", CIMultiDict()
+                    elif response.status == 304:
+                        return response.status, "", CIMultiDict(response.headers)
+                    else:
+                        self.logger.warning(f"HTTP {response.status} for {url}")
+                        return response.status, "", CIMultiDict()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not self.retry_policy.should_retry(attempt, error=e):
+                    self.logger.warning(f"Client error fetching {url}: {e!r}")
+                    return 0, "", CIMultiDict()
+                delay = self.retry_policy.backoff(attempt)
+                self.logger.info(f"Error fetching {url} ({e!r}), retrying in {delay:.1f}s")
+            except Exception as e:
+                self.logger.debug(f"Error fetching {url}: {e}")
+                return 0, "", CIMultiDict()
+
+            await asyncio.sleep(delay)
+
+    async def fetch_page_links(self, session: aiohttp.ClientSession, url: str) -> Optional[Tuple[Dict[str, Dict[str, str]], Dict[str, str]]]:
+        """Fetch a page and extract its links.
+
+        Returns None when no HTML page could be fetched; a URL that serves a PDF is returned as its own PDF link.
+        Pages with cached links are requested conditionally, and a 304 or an unchanged body reuses those links.
+        """
+        cached = self.http_cache.get(url)
+        if cached and cached.get("links") is None:
+            cached = None
+
+        # The parse slot is taken before the fetch, so at most parse_queue_size fetched pages
+        # are held in memory waiting for the parser
+        async with self.parse_slots or nullcontext():
+            status, html, headers = await self.request_page(session, url, HTTPCache.conditional_headers(cached))
+
+            if status == 200 and 'pdf' in headers.get('Content-Type', '').lower():
+                # An extension-less URL serving application/pdf is itself a PDF link
+                return {url: {}}, {}
+
+            if status == 304 and cached:
+                self.metadata["pages_not_modified"] += 1
+                self.http_cache.put(url, headers, **cached)
+                return self.cached_links(cached)
+
+            if not html:
+                return None
+
+            content_hash = hashlib.sha256(html.encode('utf-8', errors='ignore')).hexdigest()
+            if cached and cached.get("content_hash") == content_hash:
+                self.metadata["pages_not_modified"] += 1
+                self.http_cache.put(url, headers, **cached)
+                return self.cached_links(cached)
+
+            pdf_links, page_links = await self.extract_links_async(html, url)
+            self.http_cache.put(url, headers, content_hash=content_hash,
+                                links=json.dumps({"pdf": pdf_links, "pages": page_links}))
+            return pdf_links, page_links
+
+    @staticmethod
+    def cached_links(entry: Dict) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str]]:
+        links = json.loads(entry["links"])
+        return links["pdf"], links["pages"]
 
     async def download_pdf(self, session: aiohttp.ClientSession, pdf_url: str, source_site: str, semaphore: asyncio.Semaphore = None) -> bool:
-        if pdf_url in self.downloaded_pdfs:
-            logger.debug(f"Already downloaded: {pdf_url}")
+        if self.canonicalize(pdf_url) in self.downloaded_keys:
+            self.logger.debug(f"Already downloaded: {pdf_url}")
             return True
 
-        # Acquire semaphore to limit concurrent downloads
-        if semaphore:
-            async with semaphore:
-                return await self._download_pdf_impl(session, pdf_url, source_site)
-        else:
-            return await self._download_pdf_impl(session, pdf_url, source_site)
-    
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                # Acquire semaphore to limit concurrent downloads
+                if semaphore:
+                    async with semaphore:
+                        return await self._download_pdf_impl(session, pdf_url, source_site)
+                else:
+                    return await self._download_pdf_impl(session, pdf_url, source_site)
+            except DownloadError as e:
+                if not self.retry_policy.should_retry(attempt, status=e.status, error=e.cause):
+                    self.record_failure(pdf_url, source_site, str(e), attempt)
+                    return False
+
+                # Back off outside the semaphore so other downloads keep the slot busy
+                delay = self.retry_policy.backoff(attempt, e.retry_after)
+                self.logger.warning(f"Download of {pdf_url} failed ({e}), retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+
     async def _download_pdf_impl(self, session: aiohttp.ClientSession, pdf_url: str, source_site: str) -> bool:
+        part_path = None
+        resumable = False
+        validators: Dict[str, str] = {}
         try:
             site_domain = urlparse(source_site).netloc.replace('www.', '')
             site_dir = self.output_dir / site_domain
@@ -130,46 +1169,243 @@ class PDFCrawler:
 
             pdf_filename = self.generate_filename(pdf_url)
             filepath = site_dir / pdf_filename
-
-            async with session.get(pdf_url, timeout=aiohttp.ClientTimeout(total=60)) as response:
-                if response.status == 200:
+            part_path = filepath.with_name(filepath.name + '.part')
+
+            # Continue an interrupted download when a matching .part file is on disk
+            headers = {}
+            resume_from = 0
+            partial = self.partial_downloads.get(pdf_url)
+            if partial and part_path.exists() and part_path.stat().st_size > 0:
+                resume_from = part_path.stat().st_size
+                headers['Range'] = f"bytes={resume_from}-"
+                if_range = self.if_range_validator(partial)
+                if if_range:
+                    headers['If-Range'] = if_range
+            else:
+                self.drop_partial(pdf_url)
+
+            # Revalidate a copy from an earlier run instead of downloading it again
+            cached = self.http_cache.get(pdf_url)
+            if not resume_from and cached and cached.get("path") and Path(cached["path"]).exists():
+                headers.update(HTTPCache.conditional_headers(cached))
+            else:
+                cached = None
+
+            restart = False
+            async with self.scheduler.slot(pdf_url, 'pdf') as slot, \
+                    session.get(pdf_url, headers=headers, timeout=self.download_timeout) as response:
+                slot.record(response.status, response.headers)
+                if response.status == 206 and not self.can_resume(response, partial, resume_from):
+                    restart = True
+                elif response.status == 416 and resume_from:
+                    restart = True
+                elif response.status == 304 and cached:
+                    return self.reuse_cached_pdf(pdf_url, cached, filepath)
+                elif response.status in (200, 206):
                     content_type = response.headers.get('Content-Type', '')
 
                     if 'pdf' not in content_type.lower():
-                        logger.warning(f"Not a PDF: {pdf_url} (Content-Type: {content_type})")
+                        self.logger.warning(f"Not a PDF: {pdf_url} (Content-Type: {content_type})")
                         return False
 
-                    content = await response.read()
-                    file_size_mb = len(content) / (1024 * 1024)
+                    if response.status == 200:
+                        resume_from = 0
+                    else:
+                        self.logger.info(f"Resuming {pdf_url} from byte {resume_from}")
+
+                    resumable = response.status == 206 or response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+                    validators = {
+                        "etag": response.headers.get('ETag', ''),
+                        "last_modified": response.headers.get('Last-Modified', '')
+                    }
+
+                    if resumable:
+                        self.set_partial(pdf_url, {"path": str(part_path), "bytes": resume_from, **validators})
+
+                    max_bytes = None
+                    if self.config["max_pdf_size_mb"]:
+                        max_bytes = int(self.config["max_pdf_size_mb"] * 1024 * 1024)
+                        if response.content_length and resume_from + response.content_length > max_bytes:
+                            self.discard_partial(pdf_url, part_path)
+                            return self.reject_oversized(pdf_url, source_site, resume_from + response.content_length)
+
+                    size = resume_from
+                    total_size = resume_from + response.content_length if response.content_length else None
+                    next_progress = size + PROGRESS_EVENT_BYTES
+                    digest = await asyncio.to_thread(hash_file, part_path) if resume_from else hashlib.sha256()
+                    async with aiofiles.open(part_path, 'ab' if resume_from else 'wb') as f:
+                        async for chunk in response.content.iter_chunked(self.config["download_chunk_size"]):
+                            size += len(chunk)
+                            if max_bytes is not None and size > max_bytes:
+                                break
+                            digest.update(chunk)
+                            await f.write(chunk)
+                            if size >= next_progress:
+                                next_progress = size + PROGRESS_EVENT_BYTES
+                                self.emit(DownloadProgress(pdf_url, size, total_size))
+
+                    if max_bytes is not None and size > max_bytes:
+                        self.discard_partial(pdf_url, part_path)
+                        return self.reject_oversized(pdf_url, source_site, size)
+
+                    content_hash = digest.hexdigest()
+                    stored_path = self.store_pdf(part_path, filepath, content_hash, size)
+                    self.mark_downloaded(pdf_url, filepath, content_hash)
+                    self.http_cache.put(
+                        pdf_url, response.headers,
+                        content_hash=content_hash,
+                        path=str(stored_path.resolve()),
+                        size=size
+                    )
+                    file_size_mb = size / (1024 * 1024)
 
-                    async with aiofiles.open(filepath, 'wb') as f:
-                        await f.write(content)
-
-                    self.downloaded_pdfs[pdf_url] = str(filepath)
                     self.metadata["pdfs_downloaded"] += 1
                     self.metadata["total_size_mb"] += file_size_mb
 
-                    logger.info(f"Downloaded ({file_size_mb:.2f} MB): {pdf_filename}")
+                    self.logger.info(f"Downloaded ({file_size_mb:.2f} MB): {pdf_filename}")
                     return True
                 else:
-                    logger.error(f"HTTP {response.status} for PDF: {pdf_url}")
-                    self.failed_downloads.append({
-                        "url": pdf_url,
-                        "source_site": source_site,
-                        "error": f"HTTP {response.status}"
-                    })
-                    return False
+                    raise DownloadError(
+                        f"HTTP {response.status}",
+                        status=response.status,
+                        retry_after=retry_after_seconds(response.headers)
+                    )
+
+            # The stored partial no longer matches the remote file, start over
+            self.logger.info(f"Partial download of {pdf_url} is stale, restarting")
+            self.discard_partial(pdf_url, part_path)
+            return await self._download_pdf_impl(session, pdf_url, source_site)
 
+        except DownloadError:
+            raise
         except Exception as e:
-            logger.error(f"Error downloading {pdf_url}: {e}")
-            self.failed_downloads.append({
-                "url": pdf_url,
-                "source_site": source_site,
-                "error": str(e)
-            })
-            self.metadata["pdfs_failed"] += 1
+            if part_path is not None:
+                if resumable and part_path.exists() and part_path.stat().st_size > 0:
+                    self.set_partial(pdf_url, {
+                        "path": str(part_path),
+                        "bytes": part_path.stat().st_size,
+                        **validators
+                    })
+                else:
+                    self.discard_partial(pdf_url, part_path)
+            raise DownloadError(str(e) or repr(e), cause=e) from e
+
+    def store_pdf(self, part_path: Path, filepath: Path, content_hash: str, size: int) -> Path:
+        """Move a finished download into the blob store and link it under its per-domain name.
+
+        Returns the path the bytes live at: the blob, or filepath when there is no blob store.
+        """
+        if self.blob_dir is None:
+            os.replace(part_path, filepath)
+            return filepath
+
+        blob_path = self.blob_dir / content_hash[:2] / f"{content_hash}.pdf"
+        if blob_path.exists():
+            part_path.unlink()
+            self.metadata["pdfs_deduplicated"] += 1
+            self.metadata["dedup_saved_mb"] += size / (1024 * 1024)
+            self.logger.info(f"Duplicate content, linked to existing blob {content_hash[:12]}: {filepath.name}")
+        else:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(part_path, blob_path)
+
+        link_or_copy(blob_path, filepath)
+        return blob_path
+
+    def reuse_cached_pdf(self, pdf_url: str, cached: Dict, filepath: Path) -> bool:
+        cached_path = Path(cached["path"])
+        if cached_path.resolve() != filepath.resolve():
+            link_or_copy(cached_path, filepath)
+
+        self.mark_downloaded(pdf_url, filepath, cached.get("content_hash"))
+        self.metadata["pdfs_downloaded"] += 1
+        self.metadata["pdfs_not_modified"] += 1
+        self.metadata["total_size_mb"] += filepath.stat().st_size / (1024 * 1024)
+
+        self.logger.info(f"Not modified, reused cached copy: {filepath.name}")
+        return True
+
+    def discard_partial(self, pdf_url: str, part_path: Path):
+        self.drop_partial(pdf_url)
+        part_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def if_range_validator(partial: Dict) -> str:
+        """Pick the validator for If-Range; weak ETags are not allowed there"""
+        etag = partial.get("etag", "")
+        if etag and not etag.startswith('W/'):
+            return etag
+        return partial.get("last_modified", "")
+
+    @staticmethod
+    def can_resume(response: aiohttp.ClientResponse, partial: Optional[Dict], resume_from: int) -> bool:
+        """Check a 206 response continues exactly the bytes we already have"""
+        if not partial or not resume_from:
+            return False
+
+        match = re.match(r'bytes (\d+)-', response.headers.get('Content-Range', ''))
+        if not match or int(match.group(1)) != resume_from:
             return False
 
+        etag = response.headers.get('ETag', '')
+        if etag and partial.get("etag") and etag != partial["etag"]:
+            return False
+
+        last_modified = response.headers.get('Last-Modified', '')
+        if last_modified and partial.get("last_modified") and last_modified != partial["last_modified"]:
+            return False
+
+        return True
+
+    def reject_oversized(self, pdf_url: str, source_site: str, size: int) -> bool:
+        size_mb = size / (1024 * 1024)
+        self.logger.warning(f"Skipping PDF over {self.config['max_pdf_size_mb']} MB ({size_mb:.2f} MB+): {pdf_url}")
+        # Retrying would be rejected again, so it stays out of the dead-letter file
+        self.record_failure(pdf_url, source_site, f"Larger than {self.config['max_pdf_size_mb']} MB", dead_letter=False)
+        return False
+
+    def record_failure(self, pdf_url: str, source_site: str, error: str, attempts: int = 1, dead_letter: bool = True):
+        """Record a permanently failed download and, with dead_letter, append it to the dead-letter file"""
+        self.logger.error(f"Error downloading {pdf_url}: {error}")
+        failure = {
+            "url": pdf_url,
+            "source_site": source_site,
+            "error": error,
+            "attempts": attempts,
+            "failed_at": datetime.now().isoformat()
+        }
+        self.failed_downloads.append(failure)
+        self.metadata["pdfs_failed"] += 1
+        self.emit(DownloadFailed(pdf_url, source_site, error, attempts))
+
+        if dead_letter and self.config["dead_letter_file"]:
+            try:
+                with open(self.config["dead_letter_file"], 'a') as f:
+                    f.write(json.dumps(failure) + '\n')
+            except Exception as e:
+                self.logger.error(f"Failed to write dead letter: {e}")
+
+    def load_dead_letters(self) -> List[Dict]:
+        """Read the dead-letter file, keeping the latest failure per URL"""
+        dead_letter_file = Path(self.config["dead_letter_file"]) if self.config["dead_letter_file"] else None
+        if dead_letter_file is None or not dead_letter_file.exists():
+            return []
+
+        failures: Dict[str, Dict] = {}
+        with open(dead_letter_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    failure = json.loads(line)
+                except json.JSONDecodeError:
+                    self.logger.warning(f"Skipping malformed dead letter: {line[:100]}")
+                    continue
+                failures[failure["url"]] = failure
+
+        return list(failures.values())
+
     def generate_filename(self, url: str) -> str:
         parsed = urlparse(url)
         path_parts = parsed.path.split('/')
@@ -186,123 +1422,458 @@ class PDFCrawler:
 
         return filename
 
-    def find_pdf_links(self, html: str, base_url: str) -> Set[str]:
-        pdf_links = set()
-
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
+    async def extract_links_async(self, html: str, base_url: str) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str]]:
+        """Run extract_links on the parse executor when one is configured; callers hold a parse slot"""
+        if self.parse_executor is None:
+            return extract_links(html, base_url, self.logger)
 
-            for link in soup.find_all('a', href=True):
-                href = link['href']
+        loop = asyncio.get_running_loop()
+        pdf_links, page_links, error = await loop.run_in_executor(self.parse_executor, parse_links, html, base_url)
+        if error:
+            self.logger.error(f"Error parsing HTML for {base_url}: {error}")
+        return pdf_links, page_links
 
-                full_url = urljoin(base_url, href)
+    def start_parse_executor(self):
+        if not self.config["parse_executor"] or self.parse_executor is not None:
+            return
 
-                if self.is_pdf_link(full_url):
-                    pdf_links.add(full_url)
+        workers = self.config["parse_workers"] or os.cpu_count() or 1
+        self.parse_executor = create_parse_executor(self.config["parse_executor"], workers)
+        self.parse_slots = asyncio.Semaphore(self.config["parse_queue_size"] or 2 * workers)
+        self.logger.info(f"Parsing HTML on a {self.config['parse_executor']} executor with {workers} workers")
 
+    def shutdown_parse_executor(self):
+        if self.parse_executor is not None:
+            self.parse_executor.shutdown(wait=True, cancel_futures=True)
+            self.parse_executor = None
+            self.parse_slots = None
 
-            for tag in soup.find_all(['iframe', 'embed', 'object']):
-                src = tag.get('src') or tag.get('data')
-                if src:
-                    full_url = urljoin(base_url, src)
-                    if self.is_pdf_link(full_url):
-                        pdf_links.add(full_url)
-
-        except Exception as e:
-            logger.error(f"Error parsing HTML for {base_url}: {e}")
-
-        return pdf_links
+    def find_pdf_links(self, html: str, base_url: str) -> Set[str]:
+        return set(extract_links(html, base_url, self.logger)[0])
 
     def is_pdf_link(self, url: str) -> bool:
         """Check if URL points to a PDF"""
-        url_lower = url.lower()
-
-        # Check file extension
-        if url_lower.endswith('.pdf'):
-            return True
-
-        # Check query parameters
-        if 'pdf' in url_lower and any(param in url_lower for param in ['download', 'file', 'doc']):
-            return True
-
-        return False
+        return is_pdf_link(url)
 
     def find_page_links(self, html: str, base_url: str) -> Set[str]:
-        links = set()
-        base_domain = urlparse(base_url).netloc
-
+        return set(extract_links(html, base_url, self.logger)[1])
+
+    async def crawl_pages(self, session: aiohttp.ClientSession, start_url: str,
+                          seed_pages: Optional[Dict[str, str]] = None) -> Tuple[Set[str], int]:
+        """Crawl one site's pages with a pool of workers sharing a frontier queue.
+
+        With frontier_priority the highest-scoring page is fetched next; otherwise pages go breadth-first.
+        """
+        max_pages = self.config["max_pages_per_site"]
+        prioritize = self.config["frontier_priority"]
+        # Entries are (-score, seq, depth, url): best score first, discovery order among equals
+        frontier: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        seq = itertools.count()
+        frontier.put_nowait((0.0, next(seq), 0, start_url))
+        # Frontier and visited checks use canonical keys; the URL as found is what gets fetched
+        queued: Dict[str, Tuple[str, float]] = {self.canonicalize(start_url): (start_url, 0.0)}
+        for link, anchor_text in (seed_pages or {}).items():
+            link_key = self.canonicalize(link)
+            if link_key not in queued and link_key not in self.visited_urls:
+                score = self.frontier_scorer.score(link, anchor_text, 1) if prioritize else 0.0
+                queued[link_key] = (link, score)
+                frontier.put_nowait((-score, next(seq), 1, link))
+        pdf_links: Set[str] = set()
+        pages_crawled = 0
+
+        async def worker():
+            nonlocal pages_crawled
+            while True:
+                _, _, depth, url = await frontier.get()
+                try:
+                    key = self.canonicalize(url)
+                    if key in self.visited_urls or pages_crawled >= max_pages:
+                        continue
+
+                    self.visited_urls.add(key)
+                    pages_crawled += 1
+
+                    links = await self.fetch_page_links(session, url)
+                    if links is None:
+                        self.emit(PageFetched(url, start_url, False))
+                        continue
+
+                    pdfs, page_links = links
+                    self.emit(PageFetched(url, start_url, True, len(pdfs), len(page_links)))
+                    for pdf_url, context in pdfs.items():
+                        await self.collect_pdf(pdf_url, start_url, pdf_links, context)
+
+                    if pages_crawled < max_pages:
+                        for link, anchor_text in page_links.items():
+                            # PDF links are already collected above; fetching them as pages only burns budget
+                            if prioritize and is_pdf_link(link):
+                                continue
+
+                            link_key = self.canonicalize(link)
+                            if link_key in self.visited_urls:
+                                continue
+
+                            if link_key not in queued and not self.robots_allows(link):
+                                self.metadata["robots_disallowed"] += 1
+                                queued[link_key] = (link, float('inf'))
+                                continue
+
+                            score = self.frontier_scorer.score(link, anchor_text, depth + 1, len(pdfs)) if prioritize else 0.0
+                            if link_key in queued:
+                                queued_url, queued_score = queued[link_key]
+                                if queued_url != link:
+                                    self.metadata["canonical_page_dedup_hits"] += 1
+                                # A better-scored sighting is queued again; the stale entry is skipped once visited
+                                if score <= queued_score:
+                                    continue
+
+                            queued[link_key] = (link, score)
+                            frontier.put_nowait((-score, next(seq), depth + 1, link))
+                except Exception as e:
+                    self.logger.error(f"Error crawling {url}: {e}")
+                finally:
+                    frontier.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, self.config["workers_per_site"]))]
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            await frontier.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                full_url = urljoin(base_url, href)
+        return pdf_links, pages_crawled
 
-                if urlparse(full_url).netloc == base_domain:
-                    full_url = full_url.split('#')[0]
+    async def probe_pdf(self, session: aiohttp.ClientSession, url: str) -> Dict:
+        """Check that url serves a PDF without downloading it.
 
-                    if not any(ext in full_url.lower() for ext in ['.jpg', '.png', '.gif', '.css', '.js', '.xml']):
-                        links.add(full_url)
+        Sends HEAD first and falls back to a Range GET of the first 1 KB, checked for the %PDF
+        magic, when HEAD is refused or inconclusive. verified is None when the probe itself failed.
+        """
+        timeout = aiohttp.ClientTimeout(total=self.config["verify_timeout"])
+        result = {'verified': None, 'size_bytes': None, 'content_type': None, 'last_modified': None}
 
-        except Exception as e:
-            logger.error(f"Error finding page links: {e}")
+        try:
+            async with self.scheduler.slot(url, 'pdf') as slot, \
+                    session.head(url, allow_redirects=True, timeout=timeout) as response:
+                slot.record(response.status, response.headers)
+                content_type = response.headers.get('Content-Type', '')
+                if response.status in (404, 410):
+                    result['verified'] = False
+                    return result
+                if response.status == 200 and 'pdf' in content_type.lower():
+                    length = response.headers.get('Content-Length', '')
+                    result.update(
+                        verified=True,
+                        size_bytes=int(length) if length.isdigit() else None,
+                        content_type=content_type,
+                        last_modified=response.headers.get('Last-Modified')
+                    )
+                    return result
+
+            # HEAD not allowed, or a generic type such as application/octet-stream: sniff the first bytes
+            async with self.scheduler.slot(url, 'pdf') as slot, \
+                    session.get(url, headers={'Range': 'bytes=0-1023'}, timeout=timeout) as response:
+                slot.record(response.status, response.headers)
+                if response.status not in (200, 206):
+                    result['verified'] = False if 400 <= response.status < 500 else None
+                    return result
+
+                try:
+                    head = await response.content.readexactly(1024)
+                except asyncio.IncompleteReadError as e:
+                    # Files shorter than 1 KB end before the range does
+                    head = e.partial
+                size = None
+                if response.status == 206:
+                    total = response.headers.get('Content-Range', '').rpartition('/')[2]
+                    size = int(total) if total.isdigit() else None
+                elif response.headers.get('Content-Length', '').isdigit():
+                    size = int(response.headers['Content-Length'])
+
+                result.update(
+                    verified=b'%PDF' in head,
+                    size_bytes=size,
+                    content_type=response.headers.get('Content-Type'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.debug(f"Probe failed for {url}: {e!r}")
+
+        return result
+
+    async def discover_pdf(self, pdf_url: str, source_site: str) -> Optional[Dict]:
+        """Record a PDF found in discover mode as soon as it is claimed, probing it first when verify_pdfs is set.
+
+        Returns None when the probe shows the link does not serve a PDF.
+        """
+        probe: Dict = {}
+        if self.config["verify_pdfs"]:
+            # At most verify_concurrency probes in flight across all sites
+            async with self.verify_slots:
+                probe = await self.probe_pdf(self.discovery_session, pdf_url)
+            if probe['verified'] is False:
+                return None
+
+        context = self.pdf_context.get(pdf_url, {})
+        record = {
+            'url': pdf_url,
+            'source_site': source_site,
+            'filename': self.generate_filename(pdf_url),
+            'domain': urlparse(source_site).netloc.replace('www.', ''),
+            'anchor_text': context.get("anchor", ''),
+            'heading': context.get("heading", ''),
+            'discovered_at': datetime.now().isoformat()
+        }
+        record.update(probe)
+        self.discovered_pdfs.append(record)
+        self.emit(PDFDiscovered(pdf_url, source_site, record))
+        return record
+
+    async def load_robots(self, session: aiohttp.ClientSession, url: str) -> Optional[RobotFileParser]:
+        """Fetch and cache a host's robots.txt, applying its Crawl-delay to the host scheduler"""
+        host = urlparse(url).netloc.lower()
+        if host in self.robots:
+            return self.robots[host]
+
+        status, text, _ = await self.request_page(session, robots_url(url))
+        # A missing or unreadable robots.txt places no restrictions
+        rules = parse_robots(text, robots_url(url)) if status == 200 and text else None
+        self.robots[host] = rules
+
+        if rules is not None and self.config["respect_robots"]:
+            crawl_delay = rules.crawl_delay(self.config["robots_user_agent"])
+            if crawl_delay:
+                delay = min(float(crawl_delay), self.config["robots_max_crawl_delay"])
+                self.scheduler.set_min_delay(url, delay)
+                self.logger.info(f"Honouring Crawl-delay of {delay}s for {host}")
+        return rules
+
+    def robots_allows(self, url: str) -> bool:
+        if not self.config["respect_robots"]:
+            return True
+        rules = self.robots.get(urlparse(url).netloc.lower())
+        return rules is None or rules.can_fetch(self.config["robots_user_agent"], url)
+
+    async def stream_sitemap(self, session: aiohttp.ClientSession, url: str) -> List[Tuple[str, str]]:
+        """Download one sitemap or sitemap index, parsing it as it streams in"""
+        stream = SitemapStream(self.config["sitemap_max_bytes"])
+        entries = []
+        try:
+            async with self.scheduler.slot(url) as slot, \
+                    session.get(url, timeout=aiohttp.ClientTimeout(total=self.config["timeout"])) as response:
+                slot.record(response.status, response.headers)
+                if response.status != 200:
+                    self.logger.debug(f"No sitemap at {url} (HTTP {response.status})")
+                    return entries
+
+                async for chunk in response.content.iter_chunked(self.config["download_chunk_size"]):
+                    entries.extend(stream.feed(chunk))
+                entries.extend(stream.close())
+        except SitemapTooLarge as e:
+            self.logger.warning(f"Stopped reading {url}: {e}")
+        except zlib.error as e:
+            # Keep what was parsed before the corrupt part; the rest of the site is crawled as usual
+            self.logger.warning(f"Corrupt compressed sitemap {url}: {e}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.warning(f"Error fetching sitemap {url}: {e!r}")
+        return entries
+
+    async def discover_from_sitemaps(self, session: aiohttp.ClientSession, start_url: str) -> Tuple[Set[str], Dict[str, str]]:
+        """Read a site's sitemaps, returning the PDFs and best-scored pages they list under the seed URL.
+
+        A sitemap covers the whole host, so only URLs on the seed's host and under its directory are kept.
+        """
+        rules = self.robots.get(urlparse(start_url).netloc.lower())
+        pending = sitemap_urls_for(rules, start_url)
+        seen: Set[str] = set()
+        pdf_links: Set[str] = set()
+        pages: Dict[str, float] = {}
+        max_pdfs = self.config["sitemap_max_pdfs"]
+        site_host = urlparse(self.canonicalize(start_url)).netloc
+        seed_path = urlparse(start_url).path or '/'
+        path_prefix = seed_path[:seed_path.rfind('/') + 1]
+        out_of_scope = 0
+
+        while pending and len(seen) < self.config["sitemap_max_files"]:
+            sitemap_url = pending.pop(0)
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
 
-        return links
+            for kind, url in await self.stream_sitemap(session, sitemap_url):
+                if kind == 'sitemap':
+                    pending.append(url)
+                    continue
 
-    async def crawl_site(self, session: aiohttp.ClientSession, start_url: str, semaphore: asyncio.Semaphore, mode: str = 'discover'):
-        logger.info(f"Crawling site: {start_url} (mode: {mode})")
+                parsed = urlparse(self.canonicalize(url))
+                if parsed.netloc != site_host or not (parsed.path or '/').startswith(path_prefix):
+                    out_of_scope += 1
+                elif not self.robots_allows(url):
+                    self.metadata["robots_disallowed"] += 1
+                elif is_pdf_link(url):
+                    if max_pdfs is None or len(pdf_links) < max_pdfs:
+                        pdf_links.add(url)
+                else:
+                    pages[url] = self.frontier_scorer.score(url, '', 1)
+
+        best_pages = sorted(pages, key=pages.get, reverse=True)[:self.config["sitemap_seed_pages"]]
+        if seen:
+            self.logger.info(f"Sitemaps for {start_url}: read {len(seen)}, found {len(pdf_links)} PDFs and {len(pages)} pages"
+                             f" ({out_of_scope} URLs outside {site_host}{path_prefix} skipped)")
+        return pdf_links, dict.fromkeys(best_pages, '')
+
+    async def collect_pdf(self, pdf_url: str, source_site: str, pdf_links: Set[str],
+                          context: Optional[Dict[str, str]] = None):
+        """Claim a newly found PDF for source_site and, when pipelining, queue it for the download workers.
+
+        Waits while the download queue is full, which holds back the page crawl until downloads catch up.
+        """
+        if not self.robots_allows(pdf_url):
+            self.metadata["robots_disallowed"] += 1
+            return
+
+        pdf_key = self.canonicalize(pdf_url)
+        claimed = self.pdf_keys.get(pdf_key)
+        if claimed is not None:
+            if claimed != pdf_url:
+                self.metadata["canonical_pdf_dedup_hits"] += 1
+            # Later sightings can still add link text the first one lacked
+            self.note_pdf_context(claimed, context)
+            return
+
+        self.pdf_keys[pdf_key] = pdf_url
+        pdf_links.add(pdf_url)
+        self.note_pdf_context(pdf_url, context)
+
+        if self.discovery_session is not None:
+            task = asyncio.create_task(self.discover_pdf(pdf_url, source_site))
+            self.discovery_tasks.setdefault(source_site, {})[pdf_url] = task
+        elif self.download_queue is not None:
+            self.emit(PDFDiscovered(pdf_url, source_site))
+            self.pending_downloads[source_site] = self.pending_downloads.get(source_site, 0) + 1
+            await self.download_queue.put((pdf_url, source_site))
+
+    def note_pdf_context(self, pdf_url: str, context: Optional[Dict[str, str]]):
+        """Merge a sighting's anchor text and heading into pdf_url's context and (re)index it for search"""
+        existing = self.pdf_context.get(pdf_url)
+        if existing is not None and not context:
+            return
+
+        known = existing is not None
+        existing = existing or {"anchor": '', "heading": ''}
+        context = context or {}
+        anchor = merge_text(existing["anchor"], context["anchor"]) if context.get("anchor") else existing["anchor"]
+        heading = existing["heading"] or context.get("heading", '')
+        if known and (anchor, heading) == (existing["anchor"], existing["heading"]):
+            return
+
+        # Stored back rather than updated in place, since the SQLite backend keeps a copy
+        self.pdf_context[pdf_url] = {"anchor": anchor, "heading": heading}
+        if self.search_index is None:
+            return
+        self.search_index.add(pdf_url, {
+            "name": unquote(urlparse(pdf_url).path.rsplit('/', 1)[-1]),
+            "url": pdf_url,
+            "anchor": anchor,
+            "heading": heading,
+        })
+
+    def search_pdfs(self, query: str, limit: Optional[int] = 50) -> List[Tuple[str, float]]:
+        """Rank PDFs found so far this run against query by file name, URL, anchor text and heading.
+
+        Empty unless live_search_index is set.
+        """
+        if self.search_index is None:
+            return []
+        return self.search_index.search(query, limit)
+
+    async def download_worker(self, session: aiohttp.ClientSession):
+        """Serve the shared download queue until cancelled"""
+        while True:
+            pdf_url, source_site = await self.download_queue.get()
+            try:
+                await self.download_pdf(session, pdf_url, source_site)
+            except Exception as e:
+                self.logger.error(f"Error downloading {pdf_url}: {e}")
+            finally:
+                self.download_queue.task_done()
+                async with self.downloads_done:
+                    self.pending_downloads[source_site] -= 1
+                    self.downloads_done.notify_all()
+
+    async def wait_for_site_downloads(self, source_site: str):
+        async with self.downloads_done:
+            await self.downloads_done.wait_for(lambda: self.pending_downloads.get(source_site, 0) == 0)
+        self.pending_downloads.pop(source_site, None)
+
+    async def discover_and_crawl(self, session: aiohttp.ClientSession, start_url: str) -> Tuple[Set[str], int]:
+        """Seed a site's crawl from robots.txt and its sitemaps, then crawl its HTML pages"""
+        if not (self.config["respect_robots"] or self.config["sitemap_discovery"]):
+            return await self.crawl_pages(session, start_url)
+
+        await self.load_robots(session, start_url)
+
+        seed_pdfs: Set[str] = set()
+        seed_pages: Dict[str, str] = {}
+        if self.config["sitemap_discovery"]:
+            sitemap_pdfs, seed_pages = await self.discover_from_sitemaps(session, start_url)
+            self.metadata["sitemap_pdfs"] += len(sitemap_pdfs)
+            for pdf_url in sitemap_pdfs:
+                await self.collect_pdf(pdf_url, start_url, seed_pdfs)
+
+            if seed_pdfs and self.config["sitemap_skip_crawl"]:
+                return seed_pdfs, 0
+
+        pdf_links, pages_crawled = await self.crawl_pages(session, start_url, seed_pages)
+        return pdf_links | seed_pdfs, pages_crawled
+
+    async def crawl_site(self, session: aiohttp.ClientSession, start_url: str, semaphore: asyncio.Semaphore, mode: str = 'discover',
+                         pdf_session: Optional[aiohttp.ClientSession] = None):
+        self.logger.info(f"Crawling site: {start_url} (mode: {mode})")
 
         if self.is_pdf_link(start_url):
-            logger.info(f"Direct PDF link provided: {start_url}")
-            pdf_links = {start_url}
+            self.logger.info(f"Direct PDF link provided: {start_url}")
+            pdf_links: Set[str] = set()
+            await self.collect_pdf(start_url, start_url, pdf_links)
             pages_crawled = 0
+        elif isinstance(self.visited_urls, ShardedSeenSet):
+            self.visited_urls.open_shard(self.canonicalize(start_url))
+            try:
+                pdf_links, pages_crawled = await self.discover_and_crawl(session, start_url)
+            finally:
+                self.visited_urls.drop_shard(self.canonicalize(start_url))
         else:
-            to_visit = {start_url}
-            pdf_links = set()
-            pages_crawled = 0
-
-            while to_visit and pages_crawled < CONFIG["max_pages_per_site"]:
-                url = to_visit.pop()
-
-                if url in self.visited_urls:
-                    continue
-
-                self.visited_urls.add(url)
-                pages_crawled += 1
-
-                html = await self.fetch_page(session, url)
-                if not html:
-                    continue
-
-                pdfs = self.find_pdf_links(html, url)
-                pdf_links.update(pdfs)
-
-                if pages_crawled < CONFIG["max_pages_per_site"]:
-                    new_links = self.find_page_links(html, url)
-                    to_visit.update(new_links - self.visited_urls)
-
-                await asyncio.sleep(0.5)
+            pdf_links, pages_crawled = await self.discover_and_crawl(session, start_url)
 
-        logger.info(f"Found {len(pdf_links)} PDFs on {start_url} (crawled {pages_crawled} pages)")
+        if mode == 'discover':
+            # Each PDF was recorded (and probed) as it was found; wait for this site's remaining probes
+            tasks = self.discovery_tasks.pop(start_url, {})
+            records = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+            rejected = {pdf_url for pdf_url, record in records.items() if record is None}
+            if rejected:
+                self.logger.info(f"Dropped {len(rejected)} links on {start_url} that do not serve a PDF")
+                self.metadata["pdfs_rejected_by_probe"] += len(rejected)
+                pdf_links -= rejected
+                if self.search_index is not None:
+                    for pdf_url in rejected:
+                        self.search_index.remove(pdf_url)
+
+        self.logger.info(f"Found {len(pdf_links)} PDFs on {start_url} (crawled {pages_crawled} pages)")
         self.metadata["pdfs_found"] += len(pdf_links)
 
         if mode == 'discover':
             # Discovery mode: collect metadata only, don't download
-            site_domain = urlparse(start_url).netloc.replace('www.', '')
-            for pdf_url in pdf_links:
-                pdf_filename = self.generate_filename(pdf_url)
-                self.discovered_pdfs.append({
-                    'url': pdf_url,
-                    'source_site': start_url,
-                    'filename': pdf_filename,
-                    'domain': site_domain,
-                    'discovered_at': datetime.now().isoformat()
-                })
-            logger.info(f"Discovered {len(pdf_links)} PDFs in discovery mode")
+            self.logger.info(f"Discovered {len(pdf_links)} PDFs in discovery mode")
+        elif self.download_queue is not None:
+            # Pipelined download mode: PDFs were queued as they were found; the site is done when they are
+            await self.wait_for_site_downloads(start_url)
         else:
             # Download mode: download PDFs as before
+            for pdf_url in pdf_links:
+                self.emit(PDFDiscovered(pdf_url, start_url))
             download_tasks = [
-                self.download_pdf(session, pdf_url, start_url, semaphore)
+                self.download_pdf(pdf_session or session, pdf_url, start_url, semaphore)
                 for pdf_url in pdf_links
             ]
 
@@ -310,26 +1881,71 @@ class PDFCrawler:
                 await asyncio.gather(*download_tasks)
 
         self.metadata["sites_processed"] += 1
+        if self.state is not None:
+            self.state.record_site(start_url, pages_crawled, len(pdf_links))
+        self.emit(SiteDone(start_url, pages_crawled, len(pdf_links)))
         self.save_progress()
 
     async def run(self, urls: List[str], mode: str = 'discover') -> Dict:
-        logger.info(f"Starting PDF crawler for {len(urls)} sites (mode: {mode})")
+        try:
+            return await self._run_impl(urls, mode)
+        finally:
+            self.close_log()
 
-        semaphore = asyncio.Semaphore(CONFIG["max_concurrent_downloads"])
+    async def _run_impl(self, urls: List[str], mode: str) -> Dict:
+        self.logger.info(f"Starting PDF crawler for {len(urls)} sites (mode: {mode})")
 
-        connector = aiohttp.TCPConnector(limit=CONFIG["max_concurrent_downloads"])
-        async with aiohttp.ClientSession(
-            headers={"User-Agent": CONFIG["user_agent"]},
-            connector=connector,
-            max_line_size=32768,  # Increased to 32KB
-            max_field_size=32768   # Increased to 32KB
-        ) as session:
-            tasks = []
-            for url in urls:
-                tasks.append(self.crawl_site(session, url, semaphore, mode))
+        if self.state is not None:
+            # Resume at site granularity: finished sites are skipped, unfinished ones are crawled again
+            finished = set(self.state.finished_sites())
+            if finished:
+                self.logger.info(f"Skipping {len(finished & set(urls))} sites already finished in {self.config['state_db']}")
+                urls = [url for url in urls if url not in finished]
+            self.state.reset_run()
+
+        semaphore = asyncio.Semaphore(self.config["max_concurrent_downloads"])
+        self.start_parse_executor()
 
-            for task in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Crawling sites"):
-                await task
+        try:
+            async with self.create_session('page') as page_session, self.create_session('pdf') as pdf_session:
+                download_workers = []
+                if mode == 'download' and self.config["pipeline_downloads"]:
+                    # One global pool of download workers fed by every site's crawl
+                    self.download_queue = asyncio.Queue(maxsize=self.config["download_queue_size"])
+                    self.downloads_done = asyncio.Condition()
+                    download_workers = [
+                        asyncio.create_task(self.download_worker(pdf_session))
+                        for _ in range(self.config["max_concurrent_downloads"])
+                    ]
+                elif mode == 'discover':
+                    self.discovery_session = pdf_session
+                    self.verify_slots = asyncio.Semaphore(self.config["verify_concurrency"])
+
+                tasks = []
+                try:
+                    for url in urls:
+                        tasks.append(asyncio.create_task(self.crawl_site(page_session, url, semaphore, mode, pdf_session)))
+
+                    for task in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Crawling sites"):
+                        await task
+                finally:
+                    # Sites still crawling when the run is cancelled must stop before the sessions close
+                    for task in tasks + download_workers:
+                        task.cancel()
+                    await asyncio.gather(*tasks, *download_workers, return_exceptions=True)
+                    self.download_queue = None
+                    self.downloads_done = None
+                    # Probes of sites that never finished, e.g. when the run is cancelled
+                    pending = [task for tasks in self.discovery_tasks.values() for task in tasks.values()]
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    self.discovery_tasks.clear()
+                    self.discovery_session = None
+                    self.verify_slots = None
+        finally:
+            self.shutdown_parse_executor()
+            self.logger.info(f"Connection pools: {self.pool_stats()}")
 
         self.save_metadata()
         if mode == 'download':
@@ -337,18 +1953,49 @@ class PDFCrawler:
         
         return self.generate_summary()
 
+    def stream(self, urls: List[str], mode: str = 'discover') -> AsyncIterator[CrawlEvent]:
+        """Run the crawl, yielding events as they happen and RunFinished with run()'s summary last.
+
+        Closing the iterator early cancels the crawl.
+        """
+        return self.stream_events(self.run, urls, mode)
+
+    def stream_selected(self, selected_urls: List[Dict]) -> AsyncIterator[CrawlEvent]:
+        """download_selected_pdfs() as an event stream, like stream()"""
+        return self.stream_events(self.download_selected_pdfs, selected_urls)
+
+    async def stream_events(self, func, *args) -> AsyncIterator[CrawlEvent]:
+        events: asyncio.Queue = asyncio.Queue()
+        self.event_queue = events
+        crawl = asyncio.create_task(func(*args))
+        # A None sentinel after the last event wakes the consumer when run() returns or fails
+        crawl.add_done_callback(lambda _: events.put_nowait(None))
+
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            yield RunFinished(await crawl)
+        finally:
+            self.event_queue = None
+            if not crawl.done():
+                crawl.cancel()
+                await asyncio.gather(crawl, return_exceptions=True)
+
     async def download_selected_pdfs(self, selected_urls: List[Dict]) -> Dict:
         """Download only user-selected PDFs from previously discovered list"""
-        logger.info(f"Starting download of {len(selected_urls)} selected PDFs")
+        try:
+            return await self._download_selected_impl(selected_urls)
+        finally:
+            self.close_log()
+
+    async def _download_selected_impl(self, selected_urls: List[Dict]) -> Dict:
+        self.logger.info(f"Starting download of {len(selected_urls)} selected PDFs")
         
-        semaphore = asyncio.Semaphore(CONFIG["max_concurrent_downloads"])
-        connector = aiohttp.TCPConnector(limit=CONFIG["max_concurrent_downloads"])
-        async with aiohttp.ClientSession(
-            headers={"User-Agent": CONFIG["user_agent"]},
-            connector=connector,
-            max_line_size=32768,  # Increased to 32KB
-            max_field_size=32768   # Increased to 32KB
-        ) as session:
+        semaphore = asyncio.Semaphore(self.config["max_concurrent_downloads"])
+        async with self.create_session('pdf') as session:
             download_tasks = []
             for pdf_info in selected_urls:
                 url = pdf_info['url']
@@ -359,30 +2006,112 @@ class PDFCrawler:
             
             if download_tasks:
                 await asyncio.gather(*download_tasks)
-        
+
+        self.save_progress()
+        self.save_manifest()
         return self.generate_summary()
 
+    async def retry_failed(self) -> Dict:
+        """Replay downloads from the dead-letter file, then rewrite it with the ones still failing.
+
+        The file stays in place while the replay runs (failures append to it as usual), so an interrupted
+        retry loses nothing; it is replaced atomically once the replay is over.
+        """
+        failures = [f for f in self.load_dead_letters() if self.canonicalize(f["url"]) not in self.downloaded_keys]
+        self.logger.info(f"Retrying {len(failures)} failed downloads from {self.config['dead_letter_file']}")
+
+        # Each retried URL is already counted in pdfs_failed; one that fails again is counted again,
+        # so recovered URLs drop out of the count
+        self.metadata["pdfs_failed"] = max(0, self.metadata["pdfs_failed"] - len(failures))
+        summary = await self.download_selected_pdfs(failures) if failures else self.generate_summary()
+        self.rewrite_dead_letters()
+        if failures:
+            self.save_metadata()
+        self.close_log()
+        return summary
+
+    def close_log(self):
+        """Close the run's log file; it is reopened if the crawler logs again, e.g. for a follow-up download"""
+        for handler in self.logger.handlers:
+            handler.close()
+
+    def rewrite_dead_letters(self):
+        """Replace the dead-letter file with its latest failure per URL, leaving out URLs since downloaded"""
+        if not self.config["dead_letter_file"]:
+            return
+        remaining = [f for f in self.load_dead_letters() if self.canonicalize(f["url"]) not in self.downloaded_keys]
+        tmp_path = f"{self.config['dead_letter_file']}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                for failure in remaining:
+                    f.write(json.dumps(failure) + '\n')
+            os.replace(tmp_path, self.config["dead_letter_file"])
+        except Exception as e:
+            self.logger.error(f"Failed to rewrite dead letters: {e}")
+
+    def create_session(self, pool: str) -> aiohttp.ClientSession:
+        """Build the ClientSession for the 'page' or 'pdf' connection pool"""
+        limit = self.config[f"{pool}_pool_limit"] or self.config["max_concurrent_downloads"]
+        limit_per_host = self.config[f"{pool}_pool_limit_per_host"] or 0
+        connector = aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            ttl_dns_cache=self.config["dns_cache_ttl"],
+            keepalive_timeout=self.config[f"{pool}_keepalive_timeout"]
+        )
+        stats = PoolStats(pool, limit, limit_per_host, connector)
+        self.pools[pool] = stats
+        return aiohttp.ClientSession(
+            headers={"User-Agent": self.config["user_agent"]},
+            connector=connector,
+            trace_configs=[stats.trace_config()],
+            max_line_size=32768,  # Increased to 32KB
+            max_field_size=32768   # Increased to 32KB
+        )
+
+    def pool_stats(self) -> Dict[str, Dict]:
+        """Current occupancy of the page and PDF connection pools"""
+        return {name: stats.snapshot() for name, stats in self.pools.items()}
+
     def generate_summary(self) -> Dict:
         """Generate summary of crawler results"""
         return {
             "metadata": self.metadata,
             "downloaded_pdfs": self.downloaded_pdfs,
+            "pdf_hashes": self.pdf_hashes,
             "discovered_pdfs": self.discovered_pdfs,
             "failed_downloads": self.failed_downloads
         }
 
     def save_metadata(self):
-        metadata = {
-            "metadata": self.metadata,
-            "downloaded_pdfs": self.downloaded_pdfs,
-            "discovered_pdfs": self.discovered_pdfs,
-            "failed_downloads": self.failed_downloads
-        }
-
-        with open(CONFIG["metadata_file"], 'w') as f:
+        if self.state is not None:
+            # Results stay in the state database, which can be paged through with SQL
+            self.state.flush()
+            metadata = {"metadata": self.metadata, "state_db": self.config["state_db"]}
+        else:
+            metadata = {
+                "metadata": self.metadata,
+                "downloaded_pdfs": self.downloaded_pdfs,
+                "pdf_hashes": self.pdf_hashes,
+                "discovered_pdfs": self.discovered_pdfs,
+                "failed_downloads": self.failed_downloads
+            }
+
+        with open(self.config["metadata_file"], 'w') as f:
             json.dump(metadata, f, indent=2)
 
-        logger.info(f"Metadata saved to {CONFIG['metadata_file']}")
+        self.logger.info(f"Metadata saved to {self.config['metadata_file']}")
+        self.save_manifest()
+
+    def save_manifest(self):
+        if not self.config["manifest_file"]:
+            return
+        try:
+            manifest = RunManifest.build(self.output_dir, self.downloaded_pdfs, self.pdf_hashes, self.pdf_context)
+            manifest.save(self.config["manifest_file"])
+            self.logger.info(f"Manifest of {len(manifest)} files saved to {self.config['manifest_file']}")
+        except Exception as e:
+            self.logger.error(f"Failed to save manifest: {e}")
 
     def print_summary(self):
         print("\n" + "="*60)
@@ -393,6 +2122,13 @@ class PDFCrawler:
         print(f"PDFs downloaded: {self.metadata['pdfs_downloaded']}")
         print(f"PDFs failed: {self.metadata['pdfs_failed']}")
         print(f"Total size: {self.metadata['total_size_mb']:.2f} MB")
+        print(f"Duplicate fetches avoided by URL canonicalisation: "
+              f"{self.metadata['canonical_page_dedup_hits']} pages, {self.metadata['canonical_pdf_dedup_hits']} PDFs")
+        print(f"PDFs listed in sitemaps: {self.metadata['sitemap_pdfs']}")
+        print(f"URLs skipped by robots.txt: {self.metadata['robots_disallowed']}")
+        if self.config["verify_pdfs"]:
+            print(f"Links rejected by PDF probe: {self.metadata['pdfs_rejected_by_probe']}")
+        print(f"Duplicates linked: {self.metadata['pdfs_deduplicated']} ({self.metadata['dedup_saved_mb']:.2f} MB saved)")
         print(f"Output directory: {self.output_dir}")
         print(f"Failed downloads: {len(self.failed_downloads)}")
         print("="*60 + "\n")
@@ -440,6 +2176,12 @@ def load_urls_from_file(filepath: str) -> List[str]:
 
 
 async def main():
+    if '--retry-failed' in sys.argv[1:]:
+        crawler = PDFCrawler()
+        await crawler.retry_failed()
+        crawler.print_summary()
+        return
+
     urls = load_urls_from_file(CONFIG["input_file"])
     logger.info(f"Loaded {len(urls)} URLs from {CONFIG['input_file']}")
 
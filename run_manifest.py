@@ -0,0 +1,117 @@
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional
+from urllib.parse import urlparse
+
+from search_index import SearchIndex
+
+MANIFEST_VERSION = 1
+
+
+class RunManifest:
+    """Downloaded PDFs of one run, indexed by path relative to the output directory and by URL.
+
+    Written once by the crawler when a run finishes so result views never have to walk the
+    output directory or scan the url -> path mapping per file.
+    """
+
+    def __init__(self, output_dir: Path, entries: List[Dict]):
+        self.output_dir = Path(output_dir)
+        self.entries = entries
+        self.by_path: Dict[str, Dict] = {entry["path"]: entry for entry in entries}
+        self.by_url: Dict[str, Dict] = {entry["url"]: entry for entry in entries}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def build(cls, output_dir: Path, downloaded_pdfs: Mapping[str, str],
+              pdf_hashes: Optional[Mapping[str, str]] = None,
+              pdf_context: Optional[Mapping[str, Dict[str, str]]] = None) -> 'RunManifest':
+        """Index downloaded_pdfs (url -> file path), skipping files no longer on disk"""
+        output_dir = Path(output_dir)
+        pdf_hashes = pdf_hashes or {}
+        pdf_context = pdf_context or {}
+        entries = []
+        for url, filepath in downloaded_pdfs.items():
+            path = Path(filepath)
+            try:
+                size = path.stat().st_size
+                relative = path.relative_to(output_dir).as_posix()
+            except (OSError, ValueError):
+                continue
+            context = pdf_context.get(url, {})
+            entries.append({
+                "path": relative,
+                "name": path.name,
+                "url": url,
+                # Files are stored under the source site's domain directory
+                "domain": relative.split('/', 1)[0] if '/' in relative else urlparse(url).netloc,
+                "size_bytes": size,
+                "sha256": pdf_hashes.get(url),
+                "anchor_text": context.get("anchor", ''),
+                "heading": context.get("heading", ''),
+            })
+        entries.sort(key=lambda entry: entry["path"])
+        return cls(output_dir, entries)
+
+    def search_index(self) -> SearchIndex:
+        """Search index over the entries, keyed by relative path"""
+        index = SearchIndex()
+        for entry in self.entries:
+            index.add(entry["path"], {
+                "name": entry["name"],
+                "url": entry["url"],
+                "anchor": entry.get("anchor_text"),
+                "heading": entry.get("heading"),
+            })
+        return index
+
+    def file_path(self, entry: Dict) -> Path:
+        return self.output_dir / entry["path"]
+
+    def save(self, manifest_file: str):
+        tmp_path = f"{manifest_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "output_dir": str(self.output_dir),
+                "files": self.entries,
+            }, f)
+        os.replace(tmp_path, manifest_file)
+
+    @classmethod
+    def load(cls, manifest_file: str) -> 'RunManifest':
+        with open(manifest_file, 'r') as f:
+            data = json.load(f)
+        return cls(Path(data["output_dir"]), data["files"])
+
+
+@lru_cache(maxsize=32)
+def cached_manifest(manifest_file: str, mtime: float) -> RunManifest:
+    """Parsed once per manifest version and shared read-only between requests, reruns and threads"""
+    return RunManifest.load(manifest_file)
+
+
+@lru_cache(maxsize=32)
+def cached_search_index(manifest_file: str, mtime: float) -> SearchIndex:
+    """Built once per manifest version from the cached manifest"""
+    return cached_manifest(manifest_file, mtime).search_index()
+
+
+def load_manifest(manifest_file, output_dir) -> RunManifest:
+    """Current manifest in manifest_file, or an empty one for output_dir while the crawl has not written it"""
+    try:
+        return cached_manifest(str(manifest_file), os.path.getmtime(manifest_file))
+    except OSError:
+        return RunManifest(output_dir, [])
+
+
+def load_search_index(manifest_file) -> SearchIndex:
+    """Search index of the current manifest in manifest_file, empty while there is none"""
+    try:
+        return cached_search_index(str(manifest_file), os.path.getmtime(manifest_file))
+    except OSError:
+        return SearchIndex()
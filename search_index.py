@@ -0,0 +1,162 @@
+import heapq
+import math
+import re
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+# Link text and the heading above a link usually carry the document's title
+FIELD_WEIGHTS = {
+    "anchor": 3.0,
+    "heading": 2.0,
+    "name": 2.0,
+    "url": 1.0,
+}
+# URL tokens that say nothing about the document and would otherwise match every entry
+URL_STOPWORDS = {"http", "https", "www", "pdf", "html", "htm", "php", "asp", "aspx", "com", "org", "net"}
+# Discount for query words that only match part of an indexed word
+PREFIX_MATCH = 0.7
+SUBSTRING_MATCH = 0.4
+MIN_PARTIAL_LENGTH = 3
+
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents, so "bao cao" finds "Báo cáo" """
+    text = unicodedata.normalize('NFKD', text.lower().replace('đ', 'd'))
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(normalize(text)) if len(token) > 1 or token.isdigit()]
+
+
+def trigrams(term: str) -> Set[str]:
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class SearchIndex:
+    """In-memory inverted index over document fields, with a trigram index of its vocabulary.
+
+    Documents are added one at a time as they are found. Whole-word query terms are
+    looked up directly; terms of MIN_PARTIAL_LENGTH or more also match indexed words
+    they are a prefix or substring of, found through the trigram index instead of a
+    vocabulary scan. Results are ranked by how many query terms they match, then by
+    field-weighted tf-idf.
+    """
+
+    def __init__(self):
+        # term -> {doc_id: field-weighted term frequency}
+        self.postings: Dict[str, Dict[str, float]] = {}
+        # trigram -> terms containing it
+        self.trigram_terms: Dict[str, Set[str]] = {}
+        self.doc_terms: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_terms
+
+    def add(self, doc_id: str, fields: Dict[str, Optional[str]]):
+        """Index doc_id under fields (see FIELD_WEIGHTS), replacing what it was indexed under before"""
+        if doc_id in self.doc_terms:
+            self.remove(doc_id)
+
+        weights: Dict[str, float] = {}
+        for field, text in fields.items():
+            if not text:
+                continue
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            if field == 'url':
+                text = unquote(text)
+            for token in tokenize(text):
+                if field == 'url' and token in URL_STOPWORDS:
+                    continue
+                weights[token] = weights.get(token, 0.0) + weight
+
+        for term, weight in weights.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                for gram in trigrams(term):
+                    self.trigram_terms.setdefault(gram, set()).add(term)
+            postings[doc_id] = weight
+        self.doc_terms[doc_id] = set(weights)
+
+    def remove(self, doc_id: str):
+        for term in self.doc_terms.pop(doc_id, ()):
+            postings = self.postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+                for gram in trigrams(term):
+                    terms = self.trigram_terms.get(gram)
+                    if terms is not None:
+                        terms.discard(term)
+                        if not terms:
+                            del self.trigram_terms[gram]
+
+    def expand(self, token: str) -> List[Tuple[str, float]]:
+        """Indexed terms matching a query token, with the weight of the match"""
+        matches = [(token, 1.0)] if token in self.postings else []
+        if len(token) < MIN_PARTIAL_LENGTH:
+            return matches
+
+        candidates: Optional[Set[str]] = None
+        # Rarest trigrams first, so the intersection shrinks quickly
+        for gram in sorted(trigrams(token), key=lambda g: len(self.trigram_terms.get(g, ()))):
+            terms = self.trigram_terms.get(gram)
+            if not terms:
+                return matches
+            candidates = set(terms) if candidates is None else candidates & terms
+            if not candidates:
+                return matches
+
+        for term in candidates or ():
+            if term == token or token not in term:
+                continue
+            matches.append((term, PREFIX_MATCH if term.startswith(token) else SUBSTRING_MATCH))
+        return matches
+
+    def search(self, query: str, limit: Optional[int] = 50) -> List[Tuple[str, float]]:
+        """(doc_id, score) pairs for query, best first; documents matching more query words rank higher"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.doc_terms:
+            return []
+
+        total = len(self.doc_terms)
+        scores: Dict[str, float] = {}
+        matched: Dict[str, int] = {}
+        for token in tokens:
+            # A document scores a query word by its best-matching indexed term
+            best: Dict[str, float] = {}
+            for term, match_weight in self.expand(token):
+                postings = self.postings[term]
+                factor = math.log(1 + total / len(postings)) * match_weight
+                if not best:
+                    best = {doc_id: weight * factor for doc_id, weight in postings.items()}
+                    continue
+                for doc_id, weight in postings.items():
+                    score = weight * factor
+                    if score > best.get(doc_id, 0.0):
+                        best[doc_id] = score
+            if not scores:
+                scores, matched = best, dict.fromkeys(best, 1)
+                continue
+            for doc_id, score in best.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+                matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        if len(tokens) == 1:
+            rank = scores.get
+        else:
+            def rank(doc_id: str) -> Tuple[int, float]:
+                return matched[doc_id], scores[doc_id]
+
+        if limit is None:
+            ranked = sorted(scores, key=rank, reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, scores, key=rank)
+        return [(doc_id, scores[doc_id]) for doc_id in ranked]
@@ -0,0 +1,131 @@
+import logging
+import zlib
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_NAMESPACE = 'sitemaps.org/schemas/sitemap'
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def robots_url(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, '/robots.txt', '', ''))
+
+
+def default_sitemap_url(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, '/sitemap.xml', '', ''))
+
+
+def parse_robots(text: str, url: str) -> RobotFileParser:
+    """Parse a robots.txt body into a RobotFileParser ready for can_fetch/crawl_delay/site_maps"""
+    rules = RobotFileParser(url)
+    rules.parse(text.splitlines())
+    # can_fetch() refuses everything until the rules are marked as read
+    rules.modified()
+    return rules
+
+
+class SitemapTooLarge(ValueError):
+    pass
+
+
+class SitemapStream:
+    """Incremental parser for sitemaps and sitemap indexes, fed raw (optionally gzipped) bytes as they arrive.
+
+    feed() returns the entries completed so far as (kind, url) pairs, where kind is
+    "sitemap" for children of a sitemap index and "url" for page entries. Plain-text
+    sitemaps (one URL per line) are accepted too.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.decompressor = None
+        self.started = False
+        self.sniffed = False
+        self.text_mode = False
+        self.text_tail = b''
+        self.is_index = False
+        self.parser = XMLPullParser(events=('start', 'end'))
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, str]]:
+        if not self.started:
+            if chunk[:2] == GZIP_MAGIC:
+                self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            self.started = True
+
+        if self.decompressor is not None:
+            # Cap each call so a gzip bomb cannot expand past max_bytes in memory
+            chunk = self.decompressor.decompress(chunk, self.max_bytes - self.size + 1)
+
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise SitemapTooLarge(f"sitemap exceeds {self.max_bytes} bytes")
+
+        if not self.sniffed and chunk.strip():
+            self.sniffed = True
+            self.text_mode = not chunk.lstrip().lstrip(b'\xef\xbb\xbf').lstrip().startswith(b'<')
+
+        if self.text_mode:
+            return self.feed_text(chunk)
+
+        try:
+            self.parser.feed(chunk)
+        except ParseError as e:
+            logger.debug(f"Malformed sitemap: {e}")
+            return []
+        return self.read_events()
+
+    def close(self) -> List[Tuple[str, str]]:
+        if self.text_mode:
+            entries = self.text_entries([self.text_tail])
+            self.text_tail = b''
+            return entries
+
+        try:
+            self.parser.close()
+        except ParseError as e:
+            logger.debug(f"Malformed sitemap: {e}")
+        return self.read_events()
+
+    def read_events(self) -> List[Tuple[str, str]]:
+        entries = []
+        for event, element in self.parser.read_events():
+            namespace, _, tag = element.tag.rpartition('}')
+            if namespace and SITEMAP_NAMESPACE not in namespace:
+                # Image/video/news extensions also use <loc>; only the core schema lists pages
+                continue
+
+            if event == 'start':
+                if tag == 'sitemapindex':
+                    self.is_index = True
+            elif tag == 'loc' and element.text and element.text.strip():
+                entries.append(('sitemap' if self.is_index else 'url', element.text.strip()))
+            elif tag in ('url', 'sitemap'):
+                element.clear()
+        return entries
+
+    def feed_text(self, chunk: bytes) -> List[Tuple[str, str]]:
+        lines = (self.text_tail + chunk).split(b'\n')
+        self.text_tail = lines.pop()
+        return self.text_entries(lines)
+
+    @staticmethod
+    def text_entries(lines: List[bytes]) -> List[Tuple[str, str]]:
+        entries = []
+        for line in lines:
+            url = line.strip().decode('utf-8', errors='ignore')
+            if url.startswith(('http://', 'https://')):
+                entries.append(('url', url))
+        return entries
+
+
+def sitemap_urls_for(rules: Optional[RobotFileParser], start_url: str) -> List[str]:
+    """Sitemaps listed in robots.txt, falling back to /sitemap.xml"""
+    listed = (rules.site_maps() if rules is not None else None) or []
+    return listed or [default_sitemap_url(start_url)]
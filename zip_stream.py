@@ -0,0 +1,82 @@
+import zipfile
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class ChunkSink:
+    """Write-only, unseekable file object collecting what ZipFile writes until it is drained.
+
+    Having no tell()/seek() makes ZipFile write data descriptors after each entry
+    instead of seeking back to patch its local header.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def unique_names(files: Iterable[Path]) -> List[Tuple[Path, str]]:
+    """(path, name in archive) using bare file names, suffixed where two files share a name"""
+    entries = []
+    seen = set()
+    for file in files:
+        name = file.name
+        counter = 1
+        while name in seen:
+            name = f"{file.stem}_{counter}{file.suffix}"
+            counter += 1
+        seen.add(name)
+        entries.append((file, name))
+    return entries
+
+
+def iter_zip(entries: Iterable[Tuple[Path, str]], deflate: bool = False, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a ZIP archive of entries chunk by chunk, reading each source file as it goes.
+
+    PDFs are already compressed, so entries are stored unless deflate is set. Memory use
+    stays around chunk_size whatever the archive size, and nothing is written to disk.
+    """
+    sink = ChunkSink()
+    compression = zipfile.ZIP_DEFLATED if deflate else zipfile.ZIP_STORED
+
+    with zipfile.ZipFile(sink, 'w', compression=compression, allowZip64=True) as archive:
+        for path, name in entries:
+            try:
+                info = zipfile.ZipInfo.from_file(path, name)
+            except OSError:
+                continue
+            info.compress_type = compression
+
+            # from_file() fills in file_size, which is what makes ZipFile switch to Zip64 past 4 GB
+            with open(path, 'rb') as source, archive.open(info, 'w') as target:
+                while True:
+                    chunk = source.read(chunk_size)
+                    if not chunk:
+                        break
+                    target.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+
+            data = sink.drain()
+            if data:
+                yield data
+
+    # Central directory, written when the archive is closed
+    data = sink.drain()
+    if data:
+        yield data
+